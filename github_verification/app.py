@@ -1,48 +1,129 @@
-from flask import Flask, request, jsonify
-from main import evaluate_challenge
-import os
-from dotenv import load_dotenv
+from env import load_env
 
-# Load environment variables
-load_dotenv()
+# Load environment variables, before the modules that read their settings at import
+# (jobs, commit_cache, github_pool, prompt, prescreen, main)
+load_env()
 
-app = Flask(__name__)
+from flask import Blueprint, Flask, Response, current_app, request, jsonify  # noqa: E402
+from jobs import ERROR, JobQueue, job_response  # noqa: E402
+from llm_backends import get_backend, is_known_backend  # noqa: E402
+from main import BATCH_LLM_CONCURRENCY, evaluate_challenge, evaluate_challenges_batch  # noqa: E402
+import metrics  # noqa: E402
+from prescreen import PRESCREEN  # noqa: E402
+from rate_limit import PRIORITIES  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
 
-@app.route('/eval-challenge', methods=['POST'])
+# Les routes sont partagées avec app_openai.py, qui change seulement le backend par défaut
+api = Blueprint('api', __name__)
+
+# LLM backend used when the request does not name one (see llm_backends.py)
+DEFAULT_LLM_BACKEND = None
+
+REQUIRED_PARAMS = ['repo_name', 'start_date', 'end_date', 'target_author', 'challenge_description']
+
+# Formes texte acceptées pour les options booléennes (bool("false") vaudrait True)
+BOOL_STRINGS = {'true': True, '1': True, 'false': False, '0': False}
+
+def parse_flags(data: dict, defaults: dict) -> dict:
+    """
+    Boolean options of a request (`defaults` gives their names and default values);
+    raises ValueError for anything but a JSON boolean or true/false/1/0.
+    """
+    flags = {}
+    for name, default in defaults.items():
+        value = data.get(name, default)
+        if isinstance(value, bool):
+            flags[name] = value
+        elif isinstance(value, str) and value.strip().lower() in BOOL_STRINGS:
+            flags[name] = BOOL_STRINGS[value.strip().lower()]
+        elif isinstance(value, int) and value in (0, 1):
+            flags[name] = bool(value)
+        else:
+            raise ValueError(f'{name} must be a boolean, got {value!r}')
+    return flags
+
+# Options booléennes des deux endpoints d'évaluation, avec leur valeur par défaut
+FLAG_DEFAULTS = {'refresh': False, 'prescreen': PRESCREEN, 'debug': False}
+
+def format_result(result: dict, debug: bool = False) -> dict:
+    """Response payload for one evaluation result (with the per-stage `timings` when `debug`)."""
+    # Return True if score is >= 7, False otherwise
+    is_successful = result['score'] >= 7
+
+    payload = {
+        'success': True,
+        'is_challenge_successful': is_successful,
+        'score': result['score'],
+        'summary': result['summary'],
+        'evaluation': result['evaluation'],
+        'stats': result['stats'],
+        'cached': result['cached'],
+        'prescreened': result['prescreened'],
+        'github_quota': result['github_quota']
+    }
+    if debug:
+        payload['timings'] = result['timings']
+    return payload
+
+def run_evaluation(params: dict) -> dict:
+    """Evaluate a challenge and build the response payload (runs in a job worker)."""
+    result = evaluate_challenge(
+        repo_name=params['repo_name'],
+        start_date=params['start_date'],
+        end_date=params['end_date'],
+        target_author=params['target_author'],
+        challenge_description=params['challenge_description'],
+        refresh=params['refresh'],
+        prescreen=params['prescreen'],
+        priority=params['priority'],
+        llm_function=get_backend(params['llm_backend'])
+    )
+
+    return format_result(result, debug=params['debug'])
+
+# Les évaluations tournent en arrière-plan : le handler rend la main tout de suite
+jobs = JobQueue(run_evaluation)
+
+@api.route('/eval-challenge', methods=['POST'])
 def eval_challenge():
     try:
         # Get parameters from request
         data = request.get_json()
 
         # Validate required parameters
-        required_params = ['repo_name', 'start_date', 'end_date', 'target_author', 'challenge_description']
-        for param in required_params:
+        for param in REQUIRED_PARAMS:
             if param not in data:
                 return jsonify({
                     'success': False,
                     'error': f'Missing required parameter: {param}'
                 }), 400
 
-        # Evaluate the challenge
-        result = evaluate_challenge(
-            repo_name=data['repo_name'],
-            start_date=data['start_date'],
-            end_date=data['end_date'],
-            target_author=data['target_author'],
-            challenge_description=data['challenge_description']
-        )
+        params = {param: data[param] for param in REQUIRED_PARAMS}
+        try:
+            params.update(parse_flags(data, FLAG_DEFAULTS))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        params['priority'] = data.get('priority', 'normal')
+        if params['priority'] not in PRIORITIES:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown priority: {params['priority']} (expected one of {', '.join(PRIORITIES)})"
+            }), 400
+        params['llm_backend'] = data.get('llm_backend', current_app.config['DEFAULT_LLM_BACKEND'])
+        if not is_known_backend(params['llm_backend']):
+            return jsonify({
+                'success': False,
+                'error': f"Unknown LLM backend: {params['llm_backend']}"
+            }), 400
 
-        # Return True if score is >= 7, False otherwise
-        is_successful = result['score'] >= 7
+        # Submit the evaluation; identical in-flight requests share the same job
+        job = jobs.submit(params, priority=PRIORITIES.index(params['priority']))
 
-        return jsonify({
-            'success': True,
-            'is_challenge_successful': is_successful,
-            'score': result['score'],
-            'summary': result['summary'],
-            'evaluation': result['evaluation'],
-            'stats': result['stats']
-        })
+        return jsonify({'success': True, **job_response(job)}), 202
 
     except Exception as e:
         return jsonify({
@@ -50,5 +131,113 @@ def eval_challenge():
             'error': str(e)
         }), 500
 
+@api.route('/eval-challenge/<job_id>', methods=['GET'])
+def eval_challenge_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Unknown job: {job_id}'
+        }), 404
+
+    return jsonify({'success': job['status'] != ERROR, **job_response(job)})
+
+BATCH_REQUIRED_PARAMS = ['participants', 'start_date', 'end_date', 'challenge_description']
+
+@api.route('/eval-challenge/batch', methods=['POST'])
+def eval_challenge_batch():
+    """Evaluate all participants of a challenge; one NDJSON line per participant, as each finishes."""
+    data = request.get_json()
+
+    for param in BATCH_REQUIRED_PARAMS:
+        if param not in data:
+            return jsonify({
+                'success': False,
+                'error': f'Missing required parameter: {param}'
+            }), 400
+
+    try:
+        participants = [(p['repo_name'], p['target_author']) for p in data['participants']]
+    except (KeyError, TypeError):
+        return jsonify({
+            'success': False,
+            'error': 'Each participant needs repo_name and target_author'
+        }), 400
+
+    llm_backend = data.get('llm_backend', current_app.config['DEFAULT_LLM_BACKEND'])
+    if not is_known_backend(llm_backend):
+        return jsonify({
+            'success': False,
+            'error': f'Unknown LLM backend: {llm_backend}'
+        }), 400
+
+    # Un batch passe après les évaluations unitaires quand le quota GitHub baisse
+    priority = data.get('priority', 'low')
+    if priority not in PRIORITIES:
+        return jsonify({
+            'success': False,
+            'error': f"Unknown priority: {priority} (expected one of {', '.join(PRIORITIES)})"
+        }), 400
+
+    max_concurrency = data.get('max_concurrency', BATCH_LLM_CONCURRENCY)
+    # bool est un int en Python ; 0 bloquerait tous les participants sur le sémaphore
+    if isinstance(max_concurrency, bool) or not isinstance(max_concurrency, int) or max_concurrency < 1:
+        return jsonify({
+            'success': False,
+            'error': f'max_concurrency must be a positive integer, got {max_concurrency!r}'
+        }), 400
+
+    try:
+        flags = parse_flags(data, FLAG_DEFAULTS)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    results = evaluate_challenges_batch(
+        participants,
+        start_date=data['start_date'],
+        end_date=data['end_date'],
+        challenge_description=data['challenge_description'],
+        llm_function=get_backend(llm_backend),
+        max_concurrency=max_concurrency,
+        refresh=flags['refresh'],
+        prescreen=flags['prescreen'],
+        priority=priority
+    )
+    debug = flags['debug']
+
+    def generate():
+        try:
+            for result in results:
+                participant = {'repo_name': result['repo_name'], 'target_author': result['target_author']}
+                if 'error' in result:
+                    line = {**participant, 'success': False, 'error': result['error']}
+                else:
+                    line = {**participant, **format_result(result, debug=debug)}
+                yield json.dumps(line) + '\n'
+        except Exception as e:
+            yield json.dumps({'success': False, 'error': str(e)}) + '\n'
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@api.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus metrics of this worker (stage timings, tokens, caches, GitHub quota)."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+def create_app(default_llm_backend: str = DEFAULT_LLM_BACKEND) -> Flask:
+    """
+    The evaluation API; `default_llm_backend` is used when a request does not
+    name one (None: LLM_BACKEND).
+    """
+    flask_app = Flask(__name__)
+    flask_app.config['DEFAULT_LLM_BACKEND'] = default_llm_backend
+    flask_app.register_blueprint(api)
+    return flask_app
+
+app = create_app()
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -1,88 +1,23 @@
-from flask import Flask, request, jsonify
-from main import evaluate_challenge
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
+from flask import jsonify
 
-# Load environment variables
-load_dotenv()
+from app import create_app, jobs  # noqa: F401  (jobs : même file que app.py)
 
-app = Flask(__name__)
+# Mêmes routes que app.py ; seul le backend LLM par défaut change (voir llm_backends.py)
+DEFAULT_LLM_BACKEND = 'openai'
 
-client = OpenAI()  # uses OPENAI_API_KEY from env automatically
+app = create_app(DEFAULT_LLM_BACKEND)
 
 @app.route('/')
 def home():
     return jsonify({
         'message': 'Welcome to the Challenge Evaluation API',
         'endpoints': {
-            '/eval-challenge': 'POST - Evaluate a GitHub challenge'
+            '/eval-challenge': 'POST - Submit a GitHub challenge evaluation (returns a job id)',
+            '/eval-challenge/<job_id>': 'GET - Status and result of an evaluation',
+            '/eval-challenge/batch': 'POST - Evaluate all participants of a challenge (NDJSON stream)',
+            '/metrics': 'GET - Prometheus metrics (stage timings, tokens, caches, GitHub quota)'
         }
     })
 
-def ask_openai(prompt: str) -> str:
-    """Send prompt to OpenAI API and return the response."""
-    try:
-        # Truncate prompt if it's too long (e.g., max 120k characters as a rough estimate)
-        max_prompt_chars = 120000  # to stay under 128k tokens
-        if len(prompt) > max_prompt_chars:
-            prompt = prompt[:max_prompt_chars]
-
-        response = client.chat.completions.create(
-            model="gpt-4o",  # GPT-4o: small, fast, cheap, powerful, long context (128k tokens)
-            messages=[
-                {"role": "system", "content": "Tu es un assistant expert en revue de code."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000  # Adjust as needed
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        raise Exception(f"OpenAI API error: {str(e)}")
-
-@app.route('/eval-challenge', methods=['POST'])
-def eval_challenge():
-    try:
-        # Get parameters from request
-        data = request.get_json()
-
-        # Validate required parameters
-        required_params = ['repo_name', 'start_date', 'end_date', 'target_author', 'challenge_description']
-        for param in required_params:
-            if param not in data:
-                return jsonify({
-                    'success': False,
-                    'error': f'Missing required parameter: {param}'
-                }), 400
-
-        # Evaluate the challenge
-        result = evaluate_challenge(
-            repo_name=data['repo_name'],
-            start_date=data['start_date'],
-            end_date=data['end_date'],
-            target_author=data['target_author'],
-            challenge_description=data['challenge_description'],
-            llm_function=ask_openai  # Pass the OpenAI function instead of Ollama
-        )
-
-        # Return True if score is >= 7, False otherwise
-        is_successful = result['score'] >= 7
-
-        return jsonify({
-            'success': True,
-            'is_challenge_successful': is_successful,
-            'score': result['score'],
-            'summary': result['summary'],
-            'evaluation': result['evaluation'],
-            'stats': result['stats']
-        })
-
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000, debug=True)
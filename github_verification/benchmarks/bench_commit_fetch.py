@@ -0,0 +1,99 @@
+"""
+Benchmark de la récupération des commits contre un serveur de fixtures local.
+
+Compare l'ancienne boucle séquentielle (liste de tous les commits, puis une
+requête de détail par commit, l'une après l'autre) avec fetch_commit_data
+(filtre auteur côté serveur + détails en parallèle pendant que la liste
+arrive). Affiche le nombre de requêtes et le temps par commit.
+
+Usage:
+    python benchmarks/bench_commit_fetch.py [--latency 0.02] [--sizes 10 50 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+from commit_fetch import commit_date, fetch_commit_data, filter_files, is_author  # noqa: E402
+from fixture_server import FixtureServer, make_fixture  # noqa: E402
+from github_pool import GithubPool  # noqa: E402
+from main import is_code_file  # noqa: E402
+
+REPO = "bench/repo"
+AUTHOR = "alice"
+START, END = datetime(2024, 1, 1), datetime(2030, 1, 1)
+
+
+def legacy_fetch(base_url: str) -> list[dict]:
+    """The pre-bulk behaviour: list every commit, then one detail request per commit, in sequence."""
+    commit_data = []
+    with httpx.Client(base_url=base_url) as client:
+        url = f"/repos/{REPO}/commits"
+        params = {"since": START.strftime("%Y-%m-%dT%H:%M:%SZ"), "until": END.strftime("%Y-%m-%dT%H:%M:%SZ")}
+        while url:
+            response = client.get(url, params=params)
+            for commit in response.json():
+                if is_author(commit, AUTHOR):
+                    detail = client.get(f"/repos/{REPO}/commits/{commit['sha']}").json()
+                    files = filter_files(detail["files"], is_code_file)
+                    if files:
+                        commit_data.append({
+                            "sha": commit["sha"],
+                            "date": commit_date(commit),
+                            "message": commit["commit"]["message"],
+                            "files": files
+                        })
+            url, params = response.links.get("next", {}).get("url"), None
+    return commit_data
+
+
+async def bulk_fetch(base_url: str) -> list[dict]:
+    pool = GithubPool(base_url=base_url)
+    try:
+        return await fetch_commit_data(pool.client("bench-token"), REPO, START, END, AUTHOR,
+                                       file_filter=is_code_file)
+    finally:
+        await pool.aclose()
+
+
+def run(server, fetch) -> tuple[int, float, list]:
+    server.reset_count()
+    t0 = time.perf_counter()
+    data = fetch(server.url)
+    elapsed = time.perf_counter() - t0
+    return server.request_count, elapsed, data
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.02, help="injected latency per request (s)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    args = parser.parse_args()
+
+    print(f"{'commits':>8} {'mode':<8} {'requests':>9} {'wall (s)':>9} {'ms/commit':>10}")
+    for n in args.sizes:
+        fixture = make_fixture(REPO, n)
+        with FixtureServer(fixture, latency=args.latency) as server:
+            modes = {
+                "legacy": legacy_fetch,
+                "bulk": lambda url: asyncio.run(bulk_fetch(url)),
+            }
+            results = {}
+            for mode, fetch in modes.items():
+                requests_made, elapsed, data = run(server, fetch)
+                results[mode] = data
+                print(f"{n:>8} {mode:<8} {requests_made:>9} {elapsed:>9.2f} {1000 * elapsed / n:>10.1f}")
+            if results["legacy"] != results["bulk"]:
+                print("  mismatch between legacy and bulk commit data", file=sys.stderr)
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
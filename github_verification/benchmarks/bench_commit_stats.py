@@ -0,0 +1,97 @@
+"""
+Benchmark des statistiques de commits : boucle sur les dicts vs colonnes NumPy.
+
+Compare l'ancien calcul (parcours des dicts imbriqués, `os.path.splitext` par
+fichier) avec CommitColumns (une passe pour remplir les colonnes, puis des
+réductions vectorisées), sur des historiques de 1 000 à 100 000 fichiers. Le
+calcul en colonnes donne en plus l'activité par jour, le churn par extension et
+l'histogramme des tailles de commit.
+
+Usage:
+    python benchmarks/bench_commit_stats.py [--files 1000 10000 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commit_stats import CommitColumns  # noqa: E402
+
+FILES_PER_COMMIT = 5
+EXTENSIONS = [".js", ".py", ".css", ".ts", ".html", ".go", ".rs", ".sql"]
+
+
+def make_history(n_files: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    commits = []
+    for i in range(n_files // FILES_PER_COMMIT):
+        commits.append({
+            "sha": f"{i:040x}",
+            "date": f"2024-09-{1 + i % 28:02d}T10:00:00+00:00",
+            "message": f"commit {i}",
+            "files": [
+                {"filename": f"src/dir_{j % 50}/module_{rng.randint(0, 500)}{rng.choice(EXTENSIONS)}",
+                 "additions": rng.randint(0, 200), "deletions": rng.randint(0, 50), "patch": None}
+                for j in range(FILES_PER_COMMIT)
+            ],
+        })
+    return commits
+
+
+def legacy_stats(commit_data: list[dict]) -> dict:
+    """The previous calculate_commit_stats."""
+    total_additions = total_deletions = total_files = 0
+    file_types = set()
+    for commit in commit_data:
+        for file in commit["files"]:
+            total_additions += file["additions"]
+            total_deletions += file["deletions"]
+            total_files += 1
+            _, ext = os.path.splitext(file["filename"])
+            file_types.add(ext.lower())
+    return {
+        "total_commits": len(commit_data),
+        "total_additions": total_additions,
+        "total_deletions": total_deletions,
+        "total_files": total_files,
+        "file_types": list(file_types)
+    }
+
+
+def best_of(fn, repeat: int = 5) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    CommitColumns.from_commits(make_history(10))  # import de numpy hors mesure
+
+    print(f"{'files':>8} {'legacy (ms)':>12} {'columns (ms)':>13} {'reductions (ms)':>16} {'all aggregates (ms)':>20}")
+    for n in args.files:
+        history = make_history(n)
+        legacy_time, legacy = best_of(lambda: legacy_stats(history))
+        build_time, columns = best_of(lambda: CommitColumns.from_commits(history))
+        reduce_time, stats = best_of(columns.stats)
+
+        totals = ("total_commits", "total_additions", "total_deletions", "total_files")
+        if any(legacy[k] != stats[k] for k in totals) or set(legacy["file_types"]) != set(stats["file_types"]):
+            print(f"  mismatch with the legacy stats for {n} files", file=sys.stderr)
+            return 1
+        print(f"{n:>8} {1000 * legacy_time:>12.1f} {1000 * build_time:>13.1f} {1000 * reduce_time:>16.2f} "
+              f"{1000 * (build_time + reduce_time):>20.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Benchmark de bout en bout de l'évaluateur, rejoué hors ligne depuis une cassette.
+
+Chaque scénario tourne dans un interpréteur neuf (caches vides, pic mémoire
+propre), sans réseau : les réponses GitHub et LLM viennent de la cassette
+(voir replay.py et record_cassette.py). Sans --cassette, une cassette
+synthétique est d'abord enregistrée contre le serveur de fixtures local et le
+backend "fake".
+
+Scénarios :
+    evaluate     evaluate_challenge, caches vides à chaque évaluation
+    app          POST /eval-challenge de app.py, jusqu'au résultat du job
+    app_openai   POST /eval-challenge de app_openai.py, jusqu'au résultat du job
+    batch        POST /eval-challenge/batch (latence du lot entier)
+    incremental  réévaluation avec une date de fin plus tardive (checkpoint)
+
+Affiche p50/p95, les requêtes GitHub et appels LLM par évaluation, et le pic
+de RSS. Avec --baseline, sort en erreur si un scénario régresse : plus de
+requêtes ou d'appels LLM par évaluation, ou p95 / RSS au-delà de la tolérance.
+
+Usage:
+    python benchmarks/bench_e2e.py [--cassette demo.json] [--runs 5] [--save-baseline e2e.json]
+    python benchmarks/bench_e2e.py --baseline e2e.json [--tolerance 0.5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+SCENARIOS = ["evaluate", "app", "app_openai", "batch", "incremental"]
+CHALLENGE = "faire une application qui fait la météo en react JS"
+
+
+# --- Côté enfant : un scénario rejoué dans ce processus ---
+
+def scenario_units(name: str, evaluations: list[dict]):
+    """Yield `(timed_fn, n_evaluations)`; the set-up between two units is not timed."""
+    from llm_backends import get_backend
+    from main import evaluate_challenge
+    from record_cassette import batch_groups, clear_caches, incremental_series
+
+    llm = get_backend("replay")
+
+    if name == "evaluate":
+        for evaluation in evaluations:
+            clear_caches(evaluations)
+            yield (lambda e=evaluation: evaluate_challenge(**e, llm_function=llm)), 1
+
+    elif name in ("app", "app_openai"):
+        import importlib
+
+        module = importlib.import_module(name)
+        client = module.app.test_client()
+
+        def post(evaluation: dict) -> None:
+            response = client.post("/eval-challenge", json={**evaluation, "llm_backend": "replay"})
+            job = module.jobs.wait(response.get_json()["job_id"], timeout=120, poll_interval=0.002)
+            if job["status"] != "done":
+                raise RuntimeError(f"job {job['status']}: {job['error']}")
+
+        for evaluation in evaluations:
+            clear_caches(evaluations)
+            yield (lambda e=evaluation: post(e)), 1
+
+    elif name == "batch":
+        import app
+
+        client = app.app.test_client()
+
+        def post_batch(group: dict) -> None:
+            payload = {**group, "llm_backend": "replay",
+                       "participants": [{"repo_name": r, "target_author": a} for r, a in group["participants"]]}
+            for line in client.post("/eval-challenge/batch", json=payload).get_data(as_text=True).splitlines():
+                item = json.loads(line)
+                if not item["success"]:
+                    raise RuntimeError(item["error"])
+
+        for group in batch_groups(evaluations):
+            clear_caches(evaluations)
+            yield (lambda g=group: post_batch(g)), len(group["participants"])
+
+    elif name == "incremental":
+        for series in incremental_series(evaluations):
+            clear_caches(evaluations)
+            evaluate_challenge(**series[0], llm_function=llm)
+            for evaluation in series[1:]:
+                yield (lambda e=evaluation: evaluate_challenge(**e, llm_function=llm)), 1
+
+    else:
+        raise ValueError(f"Unknown scenario: {name}")
+
+
+def run_child(name: str, cassette_path: str, runs: int, github_latency: float, llm_latency: float) -> dict:
+    import resource
+
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, HERE)
+    from replay import Cassette, use_cassette
+
+    cassette = Cassette.load(cassette_path)
+    use_cassette(cassette, "replay", github_latency=github_latency, llm_latency=llm_latency)
+
+    latencies, evaluations, github_requests, llm_calls = [], 0, 0, 0
+    for _ in range(runs):
+        for timed_fn, n in scenario_units(name, cassette.evaluations):
+            before = (cassette.github_requests, cassette.llm_calls)
+            t0 = time.perf_counter()
+            timed_fn()
+            latencies.append(1000 * (time.perf_counter() - t0))
+            evaluations += n
+            github_requests += cassette.github_requests - before[0]
+            llm_calls += cassette.llm_calls - before[1]
+
+    return {
+        "latencies_ms": latencies,
+        "evaluations": evaluations,
+        "github_requests": github_requests,
+        "llm_calls": llm_calls,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+# --- Côté parent ---
+
+def record_synthetic_cassette(path: str) -> None:
+    """Record the fixture repository (4 authors, two windows each) with the "fake" LLM backend."""
+    from fixture_server import FixtureServer, make_fixture
+
+    authors = ("alice", "bob", "carol", "dave")
+    spec = [
+        {"repo_name": "bench/repo", "target_author": author, "start_date": "2024-09-20",
+         "end_date": end_date, "challenge_description": CHALLENGE}
+        for author in authors for end_date in ("2024-09-21", "2024-09-22")
+    ]
+    spec_path = path + ".spec.json"
+    with open(spec_path, "w") as f:
+        json.dump(spec, f)
+
+    with FixtureServer(make_fixture("bench/repo", 160, authors=authors)) as server:
+        # Cache vide : sinon l'enregistrement relit le commit_cache / les checkpoints d'un run précédent
+        env = dict(os.environ, GITHUB_API_URL=server.url, GITHUB_TOKEN="bench-token",
+                   EVAL_CACHE_DIR=tempfile.mkdtemp(prefix="bench_e2e_record_"))
+        env.pop("GITHUB_TOKENS", None)
+        subprocess.run(
+            [sys.executable, os.path.join(HERE, "record_cassette.py"),
+             "--spec", spec_path, "--out", path, "--llm-backend", "fake"],
+            cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL,
+        )
+
+
+def run_scenario(name: str, args) -> dict:
+    env = dict(os.environ, GITHUB_TOKEN="replay-token", EVAL_CACHE_DIR=tempfile.mkdtemp(prefix="bench_e2e_"))
+    env.pop("GITHUB_TOKENS", None)
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", name, "--cassette", args.cassette,
+         "--runs", str(args.runs), "--github-latency", str(args.github_latency),
+         "--llm-latency", str(args.llm_latency)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if out.returncode != 0:
+        raise RuntimeError(f"scenario {name} failed:\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def summarize(raw: dict) -> dict:
+    latencies = sorted(raw["latencies_ms"])
+    p95 = statistics.quantiles(latencies, n=20, method="inclusive")[18] if len(latencies) > 1 else latencies[0]
+    return {
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(p95, 2),
+        "github_requests_per_eval": round(raw["github_requests"] / raw["evaluations"], 2),
+        "llm_calls_per_eval": round(raw["llm_calls"] / raw["evaluations"], 2),
+        "peak_rss_mb": round(raw["peak_rss_kb"] / 1024, 1),
+    }
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    problems = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        # Les compteurs sont déterministes : aucune hausse tolérée
+        for key in ("github_requests_per_eval", "llm_calls_per_eval"):
+            if result[key] > base[key]:
+                problems.append(f"{name}: {key} {base[key]} -> {result[key]}")
+        for key in ("p95_ms", "peak_rss_mb"):
+            if result[key] > base[key] * (1 + tolerance):
+                problems.append(f"{name}: {key} {base[key]} -> {result[key]} (> +{tolerance:.0%})")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cassette", help="recorded cassette (default: a synthetic one)")
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--runs", type=int, default=5, help="passes over the cassette per scenario")
+    parser.add_argument("--github-latency", type=float, default=0.0, help="simulated latency per GitHub request (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated LLM answer time (s)")
+    parser.add_argument("--save-baseline", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="fail on regressions against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p95 / RSS increase (0.5 = +50%%)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.cassette, args.runs, args.github_latency, args.llm_latency)))
+        return 0
+
+    if not args.cassette:
+        args.cassette = os.path.join(tempfile.mkdtemp(prefix="bench_e2e_"), "synthetic.json")
+        sys.path.insert(0, HERE)
+        record_synthetic_cassette(args.cassette)
+
+    print(f"{'scenario':<12} {'p50 (ms)':>9} {'p95 (ms)':>9} {'req/eval':>9} {'llm/eval':>9} {'RSS (MB)':>9}")
+    results = {}
+    for name in args.scenarios:
+        result = results[name] = summarize(run_scenario(name, args))
+        print(f"{name:<12} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['github_requests_per_eval']:>9.1f} "
+              f"{result['llm_calls_per_eval']:>9.2f} {result['peak_rss_mb']:>9.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = regressions(results, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f"regression: {problem}", file=sys.stderr)
+        if problems:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Benchmark du débit d'évaluation avec plusieurs serveurs Ollama.
+
+Lance des serveurs Ollama de test (latence injectée, une génération à la fois
+par serveur) et envoie le même lot de prompts à un seul hôte, puis à un pool
+de N hôtes. Deux scénarios en plus : un hôte lent (le routage au moins de
+requêtes en cours lui en envoie moins) et un hôte en panne (drainé dès le
+health check). Affiche les prompts par seconde et la répartition par hôte.
+
+Usage:
+    python benchmarks/bench_ollama_pool.py [--latency 0.2] [--prompts 40] [--hosts 2 4]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from contextlib import ExitStack
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_backends import OllamaBackend, OllamaPoolBackend  # noqa: E402
+from ollama_stub import StubOllama  # noqa: E402
+
+
+async def run_prompts(backend, n_prompts: int) -> tuple[float, list]:
+    t0 = time.perf_counter()
+    answers = await asyncio.gather(*(backend(f"prompt {i}") for i in range(n_prompts)))
+    return time.perf_counter() - t0, answers
+
+
+def run_scenario(name: str, servers: list, n_prompts: int, pool: bool = True) -> bool:
+    with ExitStack() as stack:
+        for server in servers:
+            stack.enter_context(server)
+        if pool:
+            backend = OllamaPoolBackend("bench", hosts=[s.url for s in servers], max_concurrency=1,
+                                        retries=2, backoff=0.05)
+        else:
+            backend = OllamaBackend("bench", host=servers[0].url, max_concurrency=1)
+        elapsed, answers = asyncio.run(run_prompts(backend, n_prompts))
+        served = " ".join(str(s.request_count) for s in servers)
+        print(f"{name:<14} {len(servers):>5} {elapsed:>9.2f} {n_prompts / elapsed:>10.1f}   {served}")
+        return all("NOTE: 8" in a for a in answers)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="generation time per prompt (s)")
+    parser.add_argument("--prompts", type=int, default=40)
+    parser.add_argument("--hosts", type=int, nargs="+", default=[2, 4])
+    args = parser.parse_args()
+
+    print(f"{'scenario':<14} {'hosts':>5} {'wall (s)':>9} {'prompts/s':>10}   prompts per host")
+    ok = run_scenario("single", [StubOllama(args.latency)], args.prompts, pool=False)
+    for n in args.hosts:
+        ok &= run_scenario("pool", [StubOllama(args.latency) for _ in range(n)], args.prompts)
+    n = max(args.hosts)
+    ok &= run_scenario("pool+slow", [StubOllama(args.latency * 4)] + [StubOllama(args.latency) for _ in range(n - 1)],
+                       args.prompts)
+    ok &= run_scenario("pool+down", [StubOllama(args.latency, fail=True)] + [StubOllama(args.latency) for _ in range(n - 1)],
+                       args.prompts)
+    if not ok:
+        print("some prompts did not get a verdict", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
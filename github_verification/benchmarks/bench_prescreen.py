@@ -0,0 +1,146 @@
+"""
+Benchmark du pré-filtre : appels LLM économisés sur un lot de participants.
+
+Juge un lot de participants synthétiques (projet React météo, projet React sans
+rapport, projet Python, diff minuscule, ...) avec et sans pré-filtre, contre un
+LLM simulé qui met `--llm-latency` secondes à répondre (deux appels à la fois). Affiche la décision par
+cas avec les signaux de `screen` (technologies, similarité), le nombre d'appels LLM et le temps total.
+Vérifie aussi les technologies détectées dans des descriptions où « vue » veut dire une vue.
+
+Usage:
+    python benchmarks/bench_prescreen.py [--participants 60] [--llm-latency 0.5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("EVAL_CACHE_DIR", tempfile.mkdtemp(prefix="bench_prescreen_"))
+
+from llm_backends import FakeBackend  # noqa: E402
+from main import calculate_commit_stats, judge_commits  # noqa: E402
+from prescreen import named_technologies, screen  # noqa: E402
+
+CHALLENGE = "faire une application qui fait la météo en react JS"
+
+
+def make_commits(i: int, files: dict, message: str) -> list[dict]:
+    return [{
+        "sha": f"{i:040x}",
+        "date": "2024-09-21T10:00:00+00:00",
+        "message": message,
+        "files": [
+            # lines None : fichier binaire, GitHub n'envoie pas de patch
+            {"filename": filename, "additions": len(lines or ()), "deletions": 0, "changes": len(lines or ()),
+             "patch": "\n".join("+" + line for line in lines) if lines is not None else None}
+            for filename, lines in files.items()
+        ],
+    }]
+
+
+REACT_WEATHER = [
+    "import React, { useState, useEffect } from 'react';",
+    "export default function Meteo({ city }) {",
+    "  const [weather, setWeather] = useState(null);",
+    "  useEffect(() => { fetch(`/api/meteo?city=${city}`).then(r => r.json()).then(setWeather); }, [city]);",
+    "  return <div className='meteo'>{weather && weather.temperature}°C</div>;",
+    "}",
+] * 3
+
+# (nom, fichiers, message, décision attendue : "llm" ou "0")
+CASES = [
+    ("react météo", {"src/Meteo.js": REACT_WEATHER, "src/App.css": [".meteo { color: blue; }"] * 5},
+     "ajout du composant météo", "llm"),
+    ("react sans rapport", {"src/TodoList.js": [
+        "import React from 'react';", "export const TodoList = ({ items }) => items.map(i => <li>{i}</li>);"] * 8},
+     "todo list", "llm"),
+    ("css seulement", {"src/styles.css": [".card { margin: 4px; }"] * 15}, "styles", "llm"),
+    ("python météo", {"meteo.py": ["def meteo(ville):", "    return requests.get(METEO_URL, params={'q': ville}).json()"] * 8},
+     "script météo", "llm"),
+    # Hors sujet, mais seul le LLM en juge : la non-correspondance des technologies ne suffit pas
+    ("python sans rapport", {"etl/pipeline.py": [
+        "import pandas as pd", "def load_sales(path):", "    return pd.read_csv(path).groupby('region').sum()"] * 8},
+     "pipeline des ventes", "llm"),
+    ("diff minuscule", {"src/index.js": ["console.log('hello');", "export {};"]}, "init", "0"),
+    ("react + image", {"src/Meteo.js": REACT_WEATHER, "public/soleil.png": None}, "icône météo", "llm"),
+    ("image seulement", {"public/soleil.png": None}, "logo", "0"),
+]
+
+
+# Description -> technologies qui doivent être détectées
+DESCRIPTIONS = [
+    ("Afficher la météo dans une vue simple", []),
+    ("Créer une page web qui affiche la météo du jour avec une vue par ville", []),
+    ("Une application Java de café pour iOS", []),
+    ("faire une application qui fait la météo en react JS", ["js", "react"]),
+    ("Un tableau de bord en Vue.js avec une API node.js.", ["node.js", "vue.js"]),
+]
+
+
+async def run(participants: list, prescreen: bool, latency: float) -> tuple[float, int, list]:
+    # Deux générations à la fois, comme un serveur Ollama
+    llm = FakeBackend("bench", score=5, latency=latency, max_concurrency=2)
+    calls = 0
+    original = llm.complete
+
+    async def counted(prompt: str) -> str:
+        nonlocal calls
+        calls += 1
+        return await original(prompt)
+
+    llm.complete = counted
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(
+        judge_commits(CHALLENGE, commits, calculate_commit_stats(commits), "2024-09-20", "2024-09-30",
+                      llm_function=llm, refresh=True, prescreen=prescreen)
+        for _, commits, _ in participants
+    ))
+    return time.perf_counter() - t0, calls, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--participants", type=int, default=60)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="simulated LLM answer time (s)")
+    args = parser.parse_args()
+
+    participants = []
+    for i in range(args.participants):
+        name, files, message, expected = CASES[i % len(CASES)]
+        participants.append((name, make_commits(i, files, f"{message} #{i}"), expected))
+
+    print(f"{'case':<22} {'lines':>6} {'tech match':>10} {'similarity':>11} {'decision':>9}")
+    wrong = 0
+    for name, commits, expected in participants[:len(CASES)]:
+        signals = screen(CHALLENGE, commits, calculate_commit_stats(commits))
+        _, _, (result,) = asyncio.run(run([("", commits, expected)], True, 0))
+        decision = "0" if result["prescreened"] else "llm"
+        wrong += decision != expected
+        print(f"{name:<22} {signals['changed_lines']:>6} {str(signals['extension_match']):>10} "
+              f"{signals['similarity']:>11.3f} {decision:>9}")
+
+    print()
+    for description, expected in DESCRIPTIONS:
+        found = named_technologies(description)
+        wrong += found != expected
+        print(f"{str(found):<22} {description}")
+
+    print()
+    print(f"{'prescreen':<10} {'LLM calls':>10} {'saved':>6} {'wall (s)':>9}")
+    without = None
+    for prescreen in (False, True):
+        elapsed, calls, _ = asyncio.run(run(participants, prescreen, args.llm_latency))
+        without = calls if without is None else without
+        print(f"{str(prescreen):<10} {calls:>10} {without - calls:>6} {elapsed:>9.2f}")
+
+    if wrong:
+        print(f"{wrong} case(s) with an unexpected decision or technologies", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Benchmark mémoire / temps de la construction du prompt.
+
+Compare l'ancienne construction par concaténation (`prompt += ...`) avec
+format_prompt (chunks générés par iter_prompt puis un seul join), sur des
+jeux de commits synthétiques de 10 à 10 000 fichiers. Le pic mémoire est
+mesuré avec tracemalloc, hors données d'entrée.
+
+Usage:
+    python benchmarks/bench_prompt.py [--sizes 10 100 1000 10000] [--patch-lines 60]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt import PROMPT_HEADER, PROMPT_INSTRUCTIONS, format_prompt  # noqa: E402
+
+FILES_PER_COMMIT = 10
+
+
+def make_commits(n_files: int, patch_lines: int) -> list[dict]:
+    commits = []
+    for i in range(0, n_files, FILES_PER_COMMIT):
+        files = [
+            {
+                "filename": f"src/feature_{i}/file_{j}.js",
+                "additions": patch_lines,
+                "deletions": j,
+                # Chaque patch est un objet str distinct, comme ceux de l'API
+                "patch": "\n".join(f"+const v{k} = {i + j + k};" for k in range(patch_lines)),
+            }
+            for j in range(min(FILES_PER_COMMIT, n_files - i))
+        ]
+        commits.append({"sha": f"{i:040x}", "date": "2024-09-20T10:00:00+00:00",
+                        "message": f"feature {i}", "files": files})
+    return commits
+
+
+def legacy_format_prompt(challenge_description: str, commits: list[dict]) -> str:
+    """The concatenation-based builder format_prompt replaced."""
+    prompt = PROMPT_HEADER.format(challenge_description=challenge_description)
+    for commit in commits:
+        prompt += f"\n---\n🔐 Commit {commit['sha'][:7]} - {commit['date']}\n📝 Message: {commit['message']}\n"
+        for file in commit["files"]:
+            prompt += f"\n📄 Fichier: {file['filename']} (+{file['additions']} / -{file['deletions']})\n"
+            if file["patch"]:
+                prompt += f"diff\n{file['patch']}\n\n"
+    prompt += PROMPT_INSTRUCTIONS
+    return prompt
+
+
+def measure(build) -> tuple[float, float, int]:
+    # Temps et mémoire mesurés séparément : tracemalloc ralentit beaucoup les allocations
+    t0 = time.perf_counter()
+    prompt = build()
+    elapsed = time.perf_counter() - t0
+    del prompt
+    tracemalloc.start()
+    prompt = build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6, len(prompt)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--patch-lines", type=int, default=60)
+    args = parser.parse_args()
+
+    description = "faire une application qui fait la météo en react JS"
+    modes = {
+        "legacy": lambda commits: legacy_format_prompt(description, commits),
+        "chunks": lambda commits: format_prompt(description, commits, "", "", {}),
+        "budget": lambda commits: format_prompt(description, commits, "", "", {}, model="ollama:qwen3:4b"),
+    }
+
+    print(f"{'files':>6} {'mode':<7} {'time (ms)':>10} {'peak (MB)':>10} {'prompt (MB)':>12}")
+    for n in args.sizes:
+        commits = make_commits(n, args.patch_lines)
+        for mode, build in modes.items():
+            elapsed, peak, size = measure(lambda: build(commits))
+            print(f"{n:>6} {mode:<7} {1000 * elapsed:>10.1f} {peak:>10.1f} {size / 1e6:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
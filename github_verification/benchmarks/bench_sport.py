@@ -0,0 +1,107 @@
+"""
+Benchmark du comptage d'exercices : images par seconde, headless vs annoté.
+
+Compte la vidéo `--runs` fois par mode : headless (ni dessin ni fenêtre),
+annoté (landmarks et compteurs dessinés, sans fenêtre) et, si un écran est
+disponible (DISPLAY), annoté avec la fenêtre OpenCV. Avec --workers, mesure
+aussi le pool de processus : `--videos` copies de la vidéo réparties sur N
+processus, puis la vidéo découpée en N segments. Les comptes doivent être les
+mêmes partout.
+
+Usage:
+    python benchmarks/bench_sport.py [--video pushup.mp4] [--runs 3] [--workers 1 2 4] [--videos 8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import cv2  # noqa: E402
+from sport import VerificationPool, count_exercises  # noqa: E402
+
+MODES = {
+    "headless": {"headless": True},
+    "annotated": {"display": False},
+    "annotated+window": {"display": True},
+}
+
+
+def frame_count(video_path: str) -> int:
+    cap = cv2.VideoCapture(video_path)
+    try:
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+
+
+def bench_pool(video_path: str, frames: int, workers: list[int], n_videos: int) -> list[dict]:
+    """Throughput of the pool on `n_videos` copies, and on one video split in segments."""
+    print()
+    print(f"{'workers':>7} {'videos/s':>9} {'speedup':>8} {'segmented fps':>14} {'speedup':>8}")
+    # Copies sous des noms différents (liens) : une tâche par vidéo soumise
+    tmp = tempfile.mkdtemp(prefix="bench_sport_")
+    copies = []
+    for i in range(n_videos):
+        copies.append(os.path.join(tmp, f"{i}_{os.path.basename(video_path)}"))
+        os.symlink(os.path.abspath(video_path), copies[-1])
+
+    results = []
+    base = None
+    for n in workers:
+        with VerificationPool(n) as pool:
+            # Démarrage des processus (import de MediaPipe, création du Pose) hors mesure
+            pool.count_videos([video_path])
+            start = time.perf_counter()
+            batch = pool.count_videos(copies)
+            videos_per_s = n_videos / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            segmented = pool.count_long_video(video_path, segments=n)
+            segmented_fps = frames / (time.perf_counter() - start)
+        base = base or (videos_per_s, segmented_fps)
+        print(f"{n:>7} {videos_per_s:>9.2f} {videos_per_s / base[0]:>7.2f}x "
+              f"{segmented_fps:>14.1f} {segmented_fps / base[1]:>7.2f}x")
+        results.extend(batch.values())
+        results.append(segmented)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--video", default=os.path.join(ROOT, "pushup.mp4"))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[], help="pool sizes to measure")
+    parser.add_argument("--videos", type=int, default=8, help="videos per pool measurement")
+    args = parser.parse_args()
+
+    modes = [m for m in MODES if m != "annotated+window" or os.environ.get("DISPLAY")]
+    frames = frame_count(args.video)
+    print(f"{args.video}: {frames} frames")
+    print(f"{'mode':<18} {'fps':>8} {'ms/frame':>9} {'pushups':>8} {'squats':>7}")
+
+    counts = {}
+    for mode in modes:
+        best = None
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            result = count_exercises(args.video, **MODES[mode])
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        counts[mode] = result
+        print(f"{mode:<18} {frames / best:>8.1f} {1000 * best / frames:>9.2f} "
+              f"{result['pushups']:>8} {result['squats']:>7}")
+
+    pool_counts = bench_pool(args.video, frames, args.workers, args.videos) if args.workers else []
+
+    if len({(c["pushups"], c["squats"]) for c in list(counts.values()) + pool_counts}) > 1:
+        print("counts differ between modes", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Benchmark du cache de landmarks : comptage à froid vs recomptage depuis le cache.
+
+Compte `--videos` copies de la vidéo (liens dans un dossier temporaire) : une
+première fois avec le modèle de pose (et l'écriture du cache), puis depuis le
+cache (landmarks mappés en mémoire, sans décodage ni MediaPipe), puis avec
+d'autres seuils via `recount_cached`. Les comptes avec les seuils par défaut
+doivent être identiques avec et sans cache.
+
+Usage:
+    python benchmarks/bench_sport_cache.py [--video pushup.mp4] [--videos 4] [--runs 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sport import count_exercises, landmark_cache_path, new_pose, recount_cached  # noqa: E402
+
+# Seuils plus stricts (coude plus fléchi) pour le recomptage
+STRICT_THRESHOLDS = {"pushups": (80, 160), "squats": (80, 160)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--video", default=os.path.join(ROOT, "pushup.mp4"))
+    parser.add_argument("--videos", type=int, default=4, help="copies of the video")
+    parser.add_argument("--runs", type=int, default=5, help="passes over the cached copies")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_sport_cache_")
+    copies = []
+    for i in range(args.videos):
+        copies.append(os.path.join(tmp, f"{i}_{os.path.basename(args.video)}"))
+        os.symlink(os.path.abspath(args.video), copies[-1])
+
+    pose = new_pose()
+    try:
+        start = time.perf_counter()
+        cold = [count_exercises(path, headless=True, pose=pose, cache=False) for path in copies]
+        uncached = time.perf_counter() - start
+
+        start = time.perf_counter()
+        written = [count_exercises(path, headless=True, pose=pose) for path in copies]
+        first = time.perf_counter() - start
+    finally:
+        pose.close()
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        warm = [count_exercises(path, headless=True) for path in copies]
+    cached = (time.perf_counter() - start) / args.runs
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        strict = recount_cached(copies, thresholds=STRICT_THRESHOLDS)
+    recount = (time.perf_counter() - start) / args.runs
+
+    size = os.path.getsize(landmark_cache_path(copies[0]))
+    print(f"{args.video}: {args.videos} copies, cache {size / 1024:.1f} KB per video")
+    print(f"{'pass':<22} {'ms/video':>10} {'speedup':>9} {'pushups':>8} {'squats':>7}")
+    rows = [
+        ("pose model, no cache", uncached, cold[0]),
+        ("pose model + write", first, written[0]),
+        ("cached", cached, warm[0]),
+        ("recount (strict)", recount, next(iter(strict.values()))),
+    ]
+    for name, seconds, result in rows:
+        print(f"{name:<22} {1000 * seconds / args.videos:>10.2f} {uncached / seconds:>8.0f}x "
+              f"{result['pushups']:>8} {result['squats']:>7}")
+
+    if len({(c["pushups"], c["squats"]) for c in cold + written + warm}) > 1:
+        print("counts differ with the cache", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
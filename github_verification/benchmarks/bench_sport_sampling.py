@@ -0,0 +1,125 @@
+"""
+Benchmark de l'échantillonnage du comptage d'exercices : précision vs vitesse.
+
+Compte chaque clip étiqueté avec chaque réglage (pas entre les images
+analysées, échantillonnage adaptatif, largeur maximale des images passées au
+modèle) et affiche le débit, l'accélération par rapport au réglage exact
+(toutes les images, taille d'origine) et l'erreur de comptage. Le réglage le
+plus rapide qui compte juste sur tous les clips est signalé.
+
+Le fichier d'étiquettes est un JSON {"chemin.mp4": {"pushups": 4, "squats": 0}}.
+Sans --labels, les clips sont pushup.mp4 (4 pompes), sa version accélérée x2
+(une image sur deux, répétitions deux fois plus rapides) et sa version 720p.
+
+Usage:
+    python benchmarks/bench_sport_sampling.py [--labels clips.json] [--strides 1 2 3 4] [--widths 0 640 320]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import cv2  # noqa: E402
+from sport import count_exercises, new_pose  # noqa: E402
+
+PUSHUP_LABEL = {"pushups": 4, "squats": 0}
+
+
+def derive_clip(src: str, dst: str, keep_every: int = 1, width: int = None) -> str:
+    """Write `src` keeping one frame out of `keep_every` (same fps: faster motion), optionally resized."""
+    cap = cv2.VideoCapture(src)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    writer = None
+    i = 0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        if i % keep_every == 0:
+            if width:
+                frame = cv2.resize(frame, (width, round(frame.shape[0] * width / frame.shape[1])),
+                                   interpolation=cv2.INTER_AREA)
+            if writer is None:
+                writer = cv2.VideoWriter(dst, cv2.VideoWriter_fourcc(*"mp4v"), fps,
+                                         (frame.shape[1], frame.shape[0]))
+            writer.write(frame)
+        i += 1
+    cap.release()
+    writer.release()
+    return dst
+
+
+def default_clips() -> dict:
+    video = os.path.join(ROOT, "pushup.mp4")
+    tmp = tempfile.mkdtemp(prefix="bench_sport_sampling_")
+    return {
+        video: PUSHUP_LABEL,
+        derive_clip(video, os.path.join(tmp, "pushup_x2.mp4"), keep_every=2): PUSHUP_LABEL,
+        derive_clip(video, os.path.join(tmp, "pushup_720p.mp4"), width=1280): PUSHUP_LABEL,
+    }
+
+
+def frame_count(video_path: str) -> int:
+    cap = cv2.VideoCapture(video_path)
+    try:
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--labels", help="JSON file of labelled clips (default: pushup.mp4 variants)")
+    parser.add_argument("--strides", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument("--widths", type=int, nargs="+", default=[0, 640, 320], help="0 = full size")
+    args = parser.parse_args()
+
+    if args.labels:
+        with open(args.labels) as f:
+            clips = json.load(f)
+    else:
+        clips = default_clips()
+    frames = sum(frame_count(path) for path in clips)
+
+    configs = [(stride, adaptive, width)
+               for width in args.widths for stride in args.strides
+               for adaptive in ((False, True) if stride > 1 else (False,))]
+
+    print(f"{len(clips)} clips, {frames} frames")
+    print(f"{'stride':>6} {'adaptive':>8} {'width':>6} {'fps':>8} {'speedup':>8} {'exact':>6} {'abs err':>8}")
+    pose = new_pose()
+    baseline = None
+    rows = []
+    try:
+        for stride, adaptive, width in configs:
+            errors, exact = 0, 0
+            start = time.perf_counter()
+            for path, label in clips.items():
+                result = count_exercises(path, headless=True, pose=pose,
+                                         stride=stride, adaptive=adaptive, max_width=width)
+                error = abs(result["pushups"] - label["pushups"]) + abs(result["squats"] - label["squats"])
+                errors += error
+                exact += error == 0
+            fps = frames / (time.perf_counter() - start)
+            baseline = baseline or fps
+            rows.append((stride, adaptive, width, fps, exact))
+            print(f"{stride:>6} {str(adaptive):>8} {width or 'full':>6} {fps:>8.1f} {fps / baseline:>7.2f}x "
+                  f"{exact:>3}/{len(clips):<2} {errors:>8}")
+    finally:
+        pose.close()
+
+    exact_rows = [row for row in rows if row[4] == len(clips)]
+    if exact_rows:
+        stride, adaptive, width, fps, _ = max(exact_rows, key=lambda row: row[3])
+        print(f"\nfastest exact setting: stride={stride} adaptive={adaptive} max_width={width} "
+              f"({fps / baseline:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
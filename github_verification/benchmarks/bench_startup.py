@@ -0,0 +1,74 @@
+"""
+Benchmark du temps d'import de main, app et app_openai.
+
+Chaque module est importé dans un interpréteur neuf (import à froid), plusieurs
+fois, et on affiche la médiane. Avec --max-ms, le script sort en erreur si un
+module dépasse le seuil : pratique en CI pour détecter une régression du
+démarrage des workers.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--max-ms 500]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+MODULES = ["main", "app", "app_openai"]
+
+SNIPPET = """
+import time
+t0 = time.perf_counter()
+import {module}
+print((time.perf_counter() - t0) * 1000)
+"""
+
+
+def time_import(module: str) -> float:
+    """Import `module` in a fresh interpreter and return the time in ms."""
+    env = dict(os.environ)
+    # Pas de réseau pendant le benchmark : un import qui fait de l'I/O doit échouer
+    env.setdefault("GITHUB_TOKEN", "")
+    out = subprocess.run(
+        [sys.executable, "-c", SNIPPET.format(module=module)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if out.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{out.stderr}")
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="fail if a module's median import time exceeds this")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        try:
+            timings = [time_import(module) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            failed = True
+            continue
+        median = statistics.median(timings)
+        print(f"{module:<12} median {median:8.1f} ms  min {min(timings):8.1f} ms  max {max(timings):8.1f} ms")
+        if args.max_ms is not None and median > args.max_ms:
+            print(f"  -> {module} exceeds {args.max_ms} ms", file=sys.stderr)
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Serveur HTTP local qui imite le sous-ensemble de l'API GitHub utilisé par
+evaluate_challenge (repo, liste des commits, détail d'un commit), à partir d'un
+fichier de fixtures. Compte les requêtes reçues et peut injecter de la latence.
+Avec `quota`, chaque token a un quota de requêtes par fenêtre de
+`quota_window` secondes, annoncé dans les en-têtes X-RateLimit-* comme GitHub,
+et une requête hors quota reçoit un 403.
+"""
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+
+def make_fixture(repo_name: str, n_commits: int, files_per_commit: int = 3,
+                 authors: tuple = ("alice", "bob"), start: str = "2024-09-20",
+                 seed: int = 0) -> dict:
+    """Generate a synthetic repository history (newest commit first)."""
+    rng = random.Random(seed)
+    t0 = datetime.fromisoformat(start)
+    extensions = [".js", ".py", ".css", ".md", ".json"]
+    commits = []
+    for i in range(n_commits):
+        files = []
+        for j in range(files_per_commit):
+            additions = rng.randint(1, 80)
+            files.append({
+                "filename": f"src/module_{i}_{j}{rng.choice(extensions)}",
+                "additions": additions,
+                "deletions": rng.randint(0, 20),
+                "changes": additions,
+                "status": "modified",
+                "patch": "\n".join(f"+line {k}" for k in range(additions)),
+            })
+        commits.append({
+            "sha": f"{i:040x}",
+            "author": authors[i % len(authors)],
+            "date": (t0 + timedelta(minutes=10 * i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "message": f"commit {i}",
+            "files": files,
+        })
+    commits.reverse()
+    return {"repo": repo_name, "commits": commits}
+
+
+def save_fixture(fixture: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(fixture, f)
+
+
+def load_fixture(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    # File d'attente de listen() : la valeur par défaut (5) est sous GITHUB_FETCH_WORKERS (8) connexions
+    # simultanées, et un SYN refusé n'est réessayé qu'après ~1 s
+    request_queue_size = 128
+
+
+class FixtureServer:
+    """
+    Usage:
+        with FixtureServer(fixture, latency=0.02) as server:
+            Github(base_url=server.url) ...
+            server.request_count
+    """
+
+    def __init__(self, fixture: dict, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0,
+                 quota: int = None, quota_window: float = 60.0):
+        self.fixture = fixture
+        self.latency = latency
+        self.quota = quota
+        self.quota_window = quota_window
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.requests_by_token = {}
+        self._windows = {}  # token -> (fin de fenêtre, requêtes utilisées)
+        self._count_lock = threading.Lock()
+        self._httpd = _HTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_count(self) -> None:
+        with self._count_lock:
+            self.request_count = 0
+            self.rate_limited_count = 0
+            self.requests_by_token = {}
+
+    def _take_quota(self, token: str) -> tuple[bool, dict]:
+        """Count one request for `token`: `(allowed, X-RateLimit-* headers)`."""
+        with self._count_lock:
+            self.requests_by_token[token] = self.requests_by_token.get(token, 0) + 1
+            if self.quota is None:
+                return True, {}
+            now = time.time()
+            reset_at, used = self._windows.get(token, (0, 0))
+            if reset_at <= now:
+                reset_at, used = now + self.quota_window, 0
+            allowed = used < self.quota
+            used += allowed
+            self._windows[token] = (reset_at, used)
+            if not allowed:
+                self.rate_limited_count += 1
+            return allowed, {
+                "X-RateLimit-Limit": str(self.quota),
+                "X-RateLimit-Remaining": str(self.quota - used),
+                "X-RateLimit-Used": str(used),
+                "X-RateLimit-Reset": str(math.ceil(reset_at)),
+                "X-RateLimit-Resource": "core",
+            }
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Représentation JSON façon API GitHub ---
+
+    def _repo_json(self) -> dict:
+        owner, name = self.fixture["repo"].split("/")
+        return {
+            "id": 1,
+            "name": name,
+            "full_name": self.fixture["repo"],
+            "owner": {"login": owner, "id": 1},
+            "url": f"{self.url}/repos/{self.fixture['repo']}",
+        }
+
+    def _commit_json(self, commit: dict, detailed: bool) -> dict:
+        data = {
+            "sha": commit["sha"],
+            "url": f"{self.url}/repos/{self.fixture['repo']}/commits/{commit['sha']}",
+            "author": {"login": commit["author"], "id": 1},
+            "commit": {
+                "author": {"name": commit["author"], "email": f"{commit['author']}@example.com",
+                           "date": commit["date"]},
+                "message": commit["message"],
+            },
+        }
+        if detailed:
+            data["files"] = commit["files"]
+        return data
+
+    def _list_commits(self, query: dict) -> tuple[list, int]:
+        commits = self.fixture["commits"]
+        if "author" in query:
+            commits = [c for c in commits if c["author"] == query["author"]]
+        if "since" in query:
+            commits = [c for c in commits if c["date"] >= query["since"][:19]]
+        if "until" in query:
+            commits = [c for c in commits if c["date"] <= query["until"][:19]]
+        return commits, len(commits)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body, headers: dict = None):
+                headers = {**(headers or {}), **getattr(self, "_quota_headers", {})}
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                with server._count_lock:
+                    server.request_count += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+                allowed, self._quota_headers = server._take_quota(token)
+                if not allowed:
+                    return self._send(403, {"message": "API rate limit exceeded"})
+
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                prefix = f"/repos/{server.fixture['repo']}"
+                path = parsed.path.rstrip("/")
+
+                if path == prefix:
+                    return self._send(200, server._repo_json())
+
+                if path == prefix + "/commits":
+                    commits, total = server._list_commits(query)
+                    per_page = int(query.get("per_page", 30))
+                    page = int(query.get("page", 1))
+                    chunk = commits[(page - 1) * per_page: page * per_page]
+                    headers = {}
+                    if page * per_page < total:
+                        next_query = dict(query, page=str(page + 1), per_page=str(per_page))
+                        headers["Link"] = f'<{server.url}{path}?{urlencode(next_query)}>; rel="next"'
+                    return self._send(200, [server._commit_json(c, False) for c in chunk], headers)
+
+                if path.startswith(prefix + "/commits/"):
+                    sha = path.rsplit("/", 1)[1]
+                    for c in server.fixture["commits"]:
+                        if c["sha"] == sha:
+                            return self._send(200, server._commit_json(c, True))
+
+                return self._send(404, {"message": "Not Found"})
+
+        return Handler
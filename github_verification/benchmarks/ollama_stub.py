@@ -0,0 +1,119 @@
+"""
+Serveur local qui imite l'API de chat d'Ollama (/api/chat en streaming NDJSON,
+/api/version pour les health checks). Chaque réponse prend `latency` secondes,
+et au plus `parallel` réponses sont générées en même temps, comme un GPU
+(OLLAMA_NUM_PARALLEL) : les autres attendent leur tour.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPONSE = (
+    "- Résumé technique : réponse du serveur de test\n"
+    "- Évaluation :\n  - Correspondance: OUI\n"
+    "- NOTE: 8\n"
+)
+
+
+class StubOllama:
+    """
+    Usage:
+        with StubOllama(latency=0.2, parallel=1) as server:
+            OllamaBackend("bench", host=server.url) ...
+            server.request_count
+    """
+
+    def __init__(self, latency: float = 0.2, parallel: int = 1, chunks: int = 8,
+                 fail: bool = False, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.chunks = chunks
+        self.fail = fail  # répond 503 partout (hôte en panne)
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self._gpu = threading.Semaphore(parallel)
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubOllama":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status: int, body: dict):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                if server.fail:
+                    return self._send_json(503, {"error": "unavailable"})
+                if self.path == "/api/version":
+                    return self._send_json(200, {"version": "stub"})
+                return self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if server.fail:
+                    return self._send_json(503, {"error": "unavailable"})
+                if self.path != "/api/chat":
+                    return self._send_json(404, {"error": "not found"})
+                with server._count_lock:
+                    server.request_count += 1
+
+                with server._gpu:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    step = -(-len(RESPONSE) // server.chunks)
+                    try:
+                        for i in range(0, len(RESPONSE), step):
+                            time.sleep(server.latency / server.chunks)
+                            self._write_chunk(json.dumps({
+                                "model": request.get("model"),
+                                "created_at": "2024-01-01T00:00:00Z",
+                                "message": {"role": "assistant", "content": RESPONSE[i:i + step]},
+                                "done": False,
+                            }).encode() + b"\n")
+                        self._write_chunk(json.dumps({
+                            "model": request.get("model"),
+                            "created_at": "2024-01-01T00:00:00Z",
+                            "message": {"role": "assistant", "content": ""},
+                            "done": True,
+                        }).encode() + b"\n")
+                        self.wfile.write(b"0\r\n\r\n")
+                    except (BrokenPipeError, ConnectionResetError):
+                        pass  # le client a coupé le stream (NOTE reçue)
+
+        return Handler
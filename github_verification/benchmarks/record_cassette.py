@@ -0,0 +1,101 @@
+"""
+Enregistre une cassette (réponses GitHub + réponses LLM) pour bench_e2e.py.
+
+Les évaluations du fichier de spec sont jouées sur les vrais services, caches
+vidés, par tous les chemins que le benchmark rejoue : évaluation complète,
+évaluations incrémentales (même repo / auteur / début, fins croissantes) et
+batch (même période et même description). Le fichier de spec est une liste de
+{"repo_name", "target_author", "start_date", "end_date", "challenge_description"}.
+
+Usage:
+    python benchmarks/record_cassette.py --spec evaluations.json --out demo.json [--llm-backend ollama]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Les caches sont vidés entre les évaluations : jamais ceux de l'application
+os.environ["EVAL_CACHE_DIR"] = tempfile.mkdtemp(prefix="record_cassette_")
+
+from checkpoints import get_checkpoint_store  # noqa: E402
+from commit_cache import get_commit_cache  # noqa: E402
+from llm_backends import get_backend  # noqa: E402
+from main import evaluate_challenge, evaluate_challenges_batch  # noqa: E402
+from map_reduce import get_chunk_cache  # noqa: E402
+from replay import Cassette, use_cassette  # noqa: E402
+from verdict_cache import get_verdict_cache  # noqa: E402
+
+
+def clear_caches(evaluations: list[dict]) -> None:
+    """Cold start: no cached commit, checkpoint or verdict."""
+    get_commit_cache().clear()
+    for repo_name in {e["repo_name"] for e in evaluations}:
+        get_checkpoint_store().delete(repo_name)
+    get_verdict_cache().invalidate()
+    get_chunk_cache().invalidate()
+
+
+def incremental_series(evaluations: list[dict]) -> list[list[dict]]:
+    """Evaluations of the same (repo, author, start, challenge) with growing end dates."""
+    series = {}
+    for e in evaluations:
+        key = (e["repo_name"], e["target_author"], e["start_date"], e["challenge_description"])
+        series.setdefault(key, []).append(e)
+    return [sorted(s, key=lambda e: e["end_date"]) for s in series.values() if len(s) > 1]
+
+
+def batch_groups(evaluations: list[dict]) -> list[dict]:
+    """Evaluations sharing the period and the challenge, as one batch each."""
+    groups = {}
+    for e in evaluations:
+        group = groups.setdefault((e["start_date"], e["end_date"], e["challenge_description"]), {
+            "start_date": e["start_date"],
+            "end_date": e["end_date"],
+            "challenge_description": e["challenge_description"],
+            "participants": [],
+        })
+        group["participants"].append((e["repo_name"], e["target_author"]))
+    return list(groups.values())
+
+
+def record(cassette: Cassette, evaluations: list[dict], llm_backend: str = None) -> None:
+    llm = use_cassette(cassette, "record", llm_backend)
+
+    for evaluation in evaluations:
+        cassette.add_evaluation(**evaluation)
+        clear_caches(evaluations)
+        evaluate_challenge(**evaluation, llm_function=llm, incremental=False)
+
+    for series in incremental_series(evaluations):
+        clear_caches(evaluations)
+        for evaluation in series:
+            evaluate_challenge(**evaluation, llm_function=llm, incremental=True)
+
+    for group in batch_groups(evaluations):
+        clear_caches(evaluations)
+        for item in evaluate_challenges_batch(**group, llm_function=llm):
+            if "error" in item:
+                raise RuntimeError(f"{item['repo_name']} / {item['target_author']}: {item['error']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--spec", required=True, help="JSON list of evaluations to record")
+    parser.add_argument("--out", required=True, help="cassette file to write")
+    parser.add_argument("--llm-backend", default=None, help="backend to record (default: LLM_BACKEND)")
+    args = parser.parse_args()
+
+    with open(args.spec) as f:
+        evaluations = json.load(f)
+    cassette = Cassette(args.out)
+    record(cassette, evaluations, args.llm_backend or get_backend().name)
+    cassette.save()
+    print(f"{len(cassette.github)} GitHub responses, {len(cassette.llm)} LLM answers -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from commit_cache import CACHE_DIR
+
+# Un checkpoint ne couvre jamais les dernières minutes : un commit daté juste avant
+# `now` peut n'être poussé (ou visible dans l'API) qu'un peu plus tard
+CHECKPOINT_MARGIN = timedelta(minutes=int(os.getenv("CHECKPOINT_MARGIN_MINUTES", "60")))
+
+
+def covered_bound(start: datetime, end: datetime, now: datetime = None) -> datetime:
+    """
+    The end of the window a checkpoint may record as complete: `end`, or
+    `now - CHECKPOINT_MARGIN` while the window is still open (naive UTC, as the challenge dates).
+    """
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    return max(start, min(end, now - CHECKPOINT_MARGIN))
+
+
+class CheckpointStore:
+    """
+    Per (repo, author, window start) record of what has already been collected.
+
+    A checkpoint keeps the end of the window covered so far, the newest commit
+    seen, the `commit_data` gathered and its stats, so that a later evaluation
+    only has to fetch the commits after `covered_until` (see `covered_bound`:
+    the commits gathered may go past it when the window was still open).
+    """
+
+    def __init__(self, path: str = None):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "checkpoints.sqlite")
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS checkpoints (
+                repo TEXT NOT NULL,
+                author TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                covered_until TEXT NOT NULL,
+                newest_sha TEXT,
+                newest_date TEXT,
+                commit_data TEXT NOT NULL,
+                stats TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (repo, author, start_date)
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, repo: str, author: str, start_date: str):
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT covered_until, newest_sha, newest_date, commit_data, stats
+                   FROM checkpoints WHERE repo = ? AND author = ? AND start_date = ?""",
+                (repo, author, start_date),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "covered_until": row[0],
+            "newest_sha": row[1],
+            "newest_date": row[2],
+            "commit_data": json.loads(row[3]),
+            "stats": json.loads(row[4]),
+        }
+
+    def put(self, repo: str, author: str, start_date: str, covered_until: str,
+            commit_data: list[dict], stats: dict) -> None:
+        # commit_data est trié du plus récent au plus ancien (ordre de l'API GitHub)
+        newest = commit_data[0] if commit_data else {}
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO checkpoints
+                   (repo, author, start_date, covered_until, newest_sha, newest_date, commit_data, stats, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (repo, author, start_date, covered_until, newest.get("sha"), newest.get("date"),
+                 json.dumps(commit_data), json.dumps(stats), time.time()),
+            )
+            self._conn.commit()
+
+    def delete(self, repo: str, author: str = None, start_date: str = None) -> None:
+        query = "DELETE FROM checkpoints WHERE repo = ?"
+        params = [repo]
+        if author is not None:
+            query += " AND author = ?"
+            params.append(author)
+        if start_date is not None:
+            query += " AND start_date = ?"
+            params.append(start_date)
+        with self._lock:
+            self._conn.execute(query, params)
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """Process-wide store, opened on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CheckpointStore()
+        return _store
@@ -0,0 +1,147 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Dossier des caches locaux (diffs, checkpoints, verdicts...)
+CACHE_DIR = os.getenv("EVAL_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+# Taille max du cache de diffs avant éviction LRU
+COMMIT_CACHE_MAX_MB = float(os.getenv("COMMIT_CACHE_MAX_MB", "512"))
+
+_SQL_CHUNK = 500  # limite du nombre de paramètres par requête SQLite
+
+
+class CommitCache:
+    """
+    On-disk cache of commit file lists, keyed by (repo, sha).
+
+    A commit never changes once pushed, so an entry never goes stale: it is only
+    dropped by the size-based LRU eviction. Entries are the filtered file lists
+    built by `commit_fetch.filter_files`, stored as JSON in SQLite so every
+    worker process shares them.
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = None):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "commits.sqlite")
+        self.path = path
+        self.max_bytes = int(max_bytes if max_bytes is not None else COMMIT_CACHE_MAX_MB * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS commit_files (
+                repo TEXT NOT NULL,
+                sha TEXT NOT NULL,
+                files TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (repo, sha)
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_commit_files_access ON commit_files (last_access)")
+        self._conn.commit()
+
+    def get_many(self, repo: str, shas: list[str]) -> dict[str, list[dict]]:
+        """Return the cached file lists for the given SHAs (missing ones are absent)."""
+        found = {}
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(shas), _SQL_CHUNK):
+                chunk = shas[i:i + _SQL_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT sha, files FROM commit_files WHERE repo = ? AND sha IN ({placeholders})",
+                    [repo, *chunk],
+                ).fetchall()
+                for sha, files in rows:
+                    found[sha] = json.loads(files)
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE commit_files SET last_access = ? WHERE repo = ? AND sha = ?",
+                        [(now, repo, sha) for sha, _ in rows],
+                    )
+            self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(set(shas)) - len(found)
+        return found
+
+    def get(self, repo: str, sha: str):
+        return self.get_many(repo, [sha]).get(sha)
+
+    def put_many(self, repo: str, entries: dict[str, list[dict]]) -> None:
+        if not entries:
+            return
+        now = time.time()
+        rows = []
+        for sha, files in entries.items():
+            payload = json.dumps(files)
+            rows.append((repo, sha, payload, len(payload), now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO commit_files (repo, sha, files, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def put(self, repo: str, sha: str, files: list[dict]) -> None:
+        self.put_many(repo, {sha: files})
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM commit_files").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for repo, sha, size in self._conn.execute(
+            "SELECT repo, sha, size FROM commit_files ORDER BY last_access ASC"
+        ):
+            victims.append((repo, sha))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM commit_files WHERE repo = ? AND sha = ?", victims)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM commit_files"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM commit_files")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_commit_cache() -> CommitCache:
+    """Process-wide cache, opened on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CommitCache()
+        return _cache
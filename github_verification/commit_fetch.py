@@ -0,0 +1,96 @@
+import asyncio
+import time
+from datetime import datetime
+
+from metrics import record_span, span
+
+
+def filter_files(files: list[dict], file_filter=None) -> list[dict]:
+    """Keep the fields the evaluator uses, for the files accepted by `file_filter`."""
+    return [
+        {
+            "filename": file["filename"],
+            "additions": file["additions"],
+            "deletions": file["deletions"],
+            "patch": file.get("patch")
+        }
+        for file in files
+        if file_filter is None or file_filter(file["filename"])
+    ]
+
+
+def is_author(commit: dict, target_author: str) -> bool:
+    return bool(commit.get("author")) and commit["author"].get("login") == target_author
+
+
+def commit_date(commit: dict) -> str:
+    return datetime.fromisoformat(commit["commit"]["author"]["date"].replace("Z", "+00:00")).isoformat()
+
+
+async def fetch_commit_data_by_author(client, repo_name: str, start, end, target_authors: list[str],
+                                      file_filter=None, cache=None) -> dict[str, list[dict]]:
+    """
+    Build `commit_data` for each of `target_authors` with a single listing of the repo.
+
+    For a single author the filter is applied by the API. Commit details are
+    fetched concurrently while the next listing pages are still coming in (the
+    client bounds the number of requests in flight). With a `CommitCache`, only
+    the SHAs that are not cached yet hit the network. Commits without matching
+    files are dropped.
+    """
+    authors = set(target_authors)
+    api_author = next(iter(authors)) if len(authors) == 1 else None
+    commits = []
+    files_by_sha = {}
+    pending = {}
+    first_fetch_at = None
+
+    async def fetch_files(sha: str) -> list[dict]:
+        detail = await client.get_commit(repo_name, sha)
+        return filter_files(detail.get("files", []), file_filter)
+
+    try:
+        with span("github_listing"):
+            async for page in client.iter_commit_pages(repo_name, start, end, author=api_author):
+                page = [c for c in page if c.get("author") and c["author"].get("login") in authors]
+                commits.extend(page)
+                if cache:
+                    files_by_sha.update(cache.get_many(repo_name, [c["sha"] for c in page]))
+                for commit in page:
+                    sha = commit["sha"]
+                    if sha not in files_by_sha and sha not in pending:
+                        first_fetch_at = first_fetch_at or time.perf_counter()
+                        pending[sha] = asyncio.ensure_future(fetch_files(sha))
+
+        fetched = dict(zip(pending, await asyncio.gather(*pending.values())))
+        if pending:
+            # Du premier détail demandé au dernier reçu : recouvre en partie le listing
+            record_span("github_commits", time.perf_counter() - first_fetch_at)
+    finally:
+        # En cas d'erreur, ne pas laisser de requêtes orphelines
+        for task in pending.values():
+            task.cancel()
+
+    if cache:
+        cache.put_many(repo_name, fetched)
+    files_by_sha.update(fetched)
+
+    commit_data = {author: [] for author in authors}
+    for commit in commits:
+        files = files_by_sha[commit["sha"]]
+        if files:
+            commit_data[commit["author"]["login"]].append({
+                "sha": commit["sha"],
+                "date": commit_date(commit),
+                "message": commit["commit"]["message"],
+                "files": files
+            })
+    return commit_data
+
+
+async def fetch_commit_data(client, repo_name: str, start, end, target_author: str,
+                            file_filter=None, cache=None) -> list[dict]:
+    """Build `commit_data` for `evaluate_challenge` (see `fetch_commit_data_by_author`)."""
+    by_author = await fetch_commit_data_by_author(client, repo_name, start, end, [target_author],
+                                                  file_filter=file_filter, cache=cache)
+    return by_author[target_author]
@@ -0,0 +1,170 @@
+"""
+Commit statistics computed on columns instead of nested dicts.
+
+`CommitColumns` holds one row per changed file (additions, deletions,
+extension id, commit index) in NumPy arrays, filled in a single pass over
+`commit_data`. Totals, per-day activity, per-extension churn and the
+commit-size histogram are then a few vectorized reductions over those columns.
+
+All aggregates are additive, so the stats of an incremental evaluation are the
+previous stats merged with the stats of the new commits (`merge_stats`).
+"""
+import functools
+
+# Bornes basses des classes de taille de commit (lignes ajoutées + supprimées)
+COMMIT_SIZE_BINS = (0, 10, 50, 200, 1000)
+COMMIT_SIZE_LABELS = ("0-9", "10-49", "50-199", "200-999", "1000+")
+
+
+@functools.lru_cache(maxsize=65536)
+def file_extension(filename: str) -> str:
+    """
+    Lowercased extension of `filename`, as `os.path.splitext` would give it.
+
+    Memoized: the same files come back commit after commit, and the fetch
+    filter (`is_code_file`) and the stats ask for the same names.
+    """
+    stem, dot, ext = filename.rpartition("/")[2].rpartition(".")
+    if not dot or not stem.strip("."):
+        return ""
+    return "." + ext.lower()
+
+
+def empty_commit_stats() -> dict:
+    return {
+        "total_commits": 0,
+        "total_additions": 0,
+        "total_deletions": 0,
+        "total_files": 0,
+        "file_types": [],
+        "per_day": {},
+        "per_extension": {},
+        "commit_sizes": dict.fromkeys(COMMIT_SIZE_LABELS, 0)
+    }
+
+
+class CommitColumns:
+    """Columnar view of `commit_data`: one row per file, plus one row per commit for the dates."""
+
+    def __init__(self, additions, deletions, ext_id, commit_idx, commit_day, extensions: list[str]):
+        self.additions = additions
+        self.deletions = deletions
+        self.ext_id = ext_id
+        self.commit_idx = commit_idx
+        self.commit_day = commit_day
+        self.extensions = extensions
+
+    @classmethod
+    def from_commits(cls, commit_data: list[dict]) -> "CommitColumns":
+        import numpy as np
+
+        ext_ids = {}
+        ext_id_of = {}  # nom de fichier -> id d'extension
+        additions, deletions, ext_id, commit_idx, commit_day = [], [], [], [], []
+        for i, commit in enumerate(commit_data):
+            # Dates GitHub en UTC : le jour est le début de la chaîne ISO
+            commit_day.append(commit["date"][:10])
+            for file in commit["files"]:
+                additions.append(file["additions"])
+                deletions.append(file["deletions"])
+                filename = file["filename"]
+                file_ext_id = ext_id_of.get(filename)
+                if file_ext_id is None:
+                    file_ext_id = ext_id_of[filename] = ext_ids.setdefault(file_extension(filename), len(ext_ids))
+                ext_id.append(file_ext_id)
+                commit_idx.append(i)
+
+        return cls(
+            additions=np.array(additions, dtype=np.int64),
+            deletions=np.array(deletions, dtype=np.int64),
+            ext_id=np.array(ext_id, dtype=np.int32),
+            commit_idx=np.array(commit_idx, dtype=np.int32),
+            commit_day=np.array(commit_day, dtype="U10"),
+            extensions=list(ext_ids)
+        )
+
+    @property
+    def n_commits(self) -> int:
+        return len(self.commit_day)
+
+    def commit_sizes(self):
+        """Lines changed per commit."""
+        import numpy as np
+
+        return np.bincount(self.commit_idx, weights=self.additions + self.deletions,
+                           minlength=self.n_commits).astype(np.int64)
+
+    def per_day(self) -> dict:
+        import numpy as np
+
+        if not self.n_commits:
+            return {}
+        days, day_of_commit = np.unique(self.commit_day, return_inverse=True)
+        day_of_file = day_of_commit[self.commit_idx]
+        commits = np.bincount(day_of_commit, minlength=len(days))
+        additions = np.bincount(day_of_file, weights=self.additions, minlength=len(days))
+        deletions = np.bincount(day_of_file, weights=self.deletions, minlength=len(days))
+        return {
+            str(day): {"commits": int(c), "additions": int(a), "deletions": int(d)}
+            for day, c, a, d in zip(days, commits, additions, deletions)
+        }
+
+    def per_extension(self) -> dict:
+        import numpy as np
+
+        n = len(self.extensions)
+        files = np.bincount(self.ext_id, minlength=n)
+        additions = np.bincount(self.ext_id, weights=self.additions, minlength=n)
+        deletions = np.bincount(self.ext_id, weights=self.deletions, minlength=n)
+        return {
+            ext: {"files": int(f), "additions": int(a), "deletions": int(d)}
+            for ext, f, a, d in zip(self.extensions, files, additions, deletions)
+        }
+
+    def commit_size_histogram(self) -> dict:
+        import numpy as np
+
+        bins = np.searchsorted(COMMIT_SIZE_BINS, self.commit_sizes(), side="right") - 1
+        counts = np.bincount(bins, minlength=len(COMMIT_SIZE_BINS))
+        return {label: int(c) for label, c in zip(COMMIT_SIZE_LABELS, counts)}
+
+    def stats(self) -> dict:
+        return {
+            "total_commits": self.n_commits,
+            "total_additions": int(self.additions.sum()),
+            "total_deletions": int(self.deletions.sum()),
+            "total_files": len(self.additions),
+            "file_types": list(self.extensions),
+            "per_day": self.per_day(),
+            "per_extension": self.per_extension(),
+            "commit_sizes": self.commit_size_histogram()
+        }
+
+
+def _merge_counts(a: dict, b: dict) -> dict:
+    merged = {key: dict(value) for key, value in a.items()}
+    for key, counts in b.items():
+        target = merged.setdefault(key, dict.fromkeys(counts, 0))
+        for name, value in counts.items():
+            target[name] = target.get(name, 0) + value
+    return merged
+
+
+def merge_stats(stats: dict, other: dict) -> dict:
+    """Stats of the union of two disjoint sets of commits."""
+    sizes = stats.get("commit_sizes") or dict.fromkeys(COMMIT_SIZE_LABELS, 0)
+    return {
+        "total_commits": stats["total_commits"] + other["total_commits"],
+        "total_additions": stats["total_additions"] + other["total_additions"],
+        "total_deletions": stats["total_deletions"] + other["total_deletions"],
+        "total_files": stats["total_files"] + other["total_files"],
+        "file_types": list(dict.fromkeys(stats["file_types"] + other["file_types"])),
+        # Les stats d'un checkpoint antérieur n'ont pas forcément les agrégats détaillés
+        "per_day": _merge_counts(stats.get("per_day", {}), other["per_day"]),
+        "per_extension": _merge_counts(stats.get("per_extension", {}), other["per_extension"]),
+        "commit_sizes": {label: sizes.get(label, 0) + other["commit_sizes"][label] for label in COMMIT_SIZE_LABELS}
+    }
+
+
+def calculate_commit_stats(commit_data: list[dict]) -> dict:
+    return CommitColumns.from_commits(commit_data).stats()
@@ -0,0 +1,21 @@
+"""
+Loading of the `.env` file.
+
+Most modules read their settings (JOB_STORE, EVAL_CACHE_DIR, GITHUB_API_URL,
+...) into constants when they are imported, so an entry point must call
+`load_env()` before importing them. This module imports nothing of the project.
+"""
+import os
+
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Load the .env file once (variables already set in the environment win)."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import find_dotenv, load_dotenv
+        # Le .env du dossier courant (ou d'un parent), puis celui à côté du code ; le premier l'emporte
+        load_dotenv(find_dotenv(usecwd=True))
+        load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
+        _env_loaded = True
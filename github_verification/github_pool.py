@@ -0,0 +1,160 @@
+import asyncio
+import os
+import threading
+import weakref
+
+from rate_limit import current_usage, get_governor, is_rate_limited
+
+# Nombre de connexions HTTP gardées ouvertes par client
+POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", "10"))
+# URL de l'API (GitHub Enterprise, ou serveur de fixtures pour les benchmarks)
+API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+# Nombre max de requêtes GitHub en vol par client
+FETCH_WORKERS = int(os.getenv("GITHUB_FETCH_WORKERS", "8"))
+# Timeout des requêtes GitHub (secondes)
+GITHUB_TIMEOUT = float(os.getenv("GITHUB_TIMEOUT", "30"))
+# Nouvelles tentatives d'une requête refusée pour rate limit (avec un autre token, ou après le reset)
+GITHUB_RATE_LIMIT_RETRIES = int(os.getenv("GITHUB_RATE_LIMIT_RETRIES", "3"))
+
+
+def _format_date(value) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class AsyncGithub:
+    """
+    Minimal async client for the GitHub REST endpoints used by the evaluator.
+
+    The underlying `httpx.AsyncClient` keeps its connections alive between
+    requests, and a semaphore bounds the number of requests in flight so many
+    concurrent evaluations share the connection pool instead of flooding it.
+    `token` can be a sequence of tokens: each request takes the one with the
+    most quota left, through the shared `RateLimitGovernor`.
+    """
+
+    def __init__(self, token, base_url: str = API_URL, pool_size: int = POOL_SIZE,
+                 max_concurrency: int = FETCH_WORKERS, timeout: float = GITHUB_TIMEOUT, governor=None,
+                 transport=None):
+        import httpx
+
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        self.tokens = [token] if token is None or isinstance(token, str) else list(token)
+        self.governor = governor or get_governor()
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            transport=transport,
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight = {}
+
+    async def get(self, url: str, params: dict = None):
+        usage = current_usage.get()
+        async with self._semaphore:
+            for attempt in range(GITHUB_RATE_LIMIT_RETRIES + 1):
+                token = await self.governor.acquire(self.tokens)
+                headers = {"Authorization": f"Bearer {token}"} if token else None
+                response = await self._client.get(url, params=params, headers=headers)
+                remaining = self.governor.update(token, response.headers)
+                if usage is not None:
+                    usage.record(token, remaining)
+                if attempt == GITHUB_RATE_LIMIT_RETRIES or not is_rate_limited(response):
+                    break
+                # Token épuisé : la prochaine tentative prend un autre token, ou attend le reset
+                self.governor.exhausted(token, response.headers)
+        response.raise_for_status()
+        return response
+
+    async def iter_commit_pages(self, repo_name: str, since, until, author: str = None, per_page: int = 100):
+        """Yield the commit listing one page at a time (newest first)."""
+        params = {"since": _format_date(since), "until": _format_date(until), "per_page": per_page}
+        if author:
+            params["author"] = author
+        url = f"/repos/{repo_name}/commits"
+        while url:
+            response = await self.get(url, params)
+            yield response.json()
+            # L'URL "next" contient déjà les paramètres
+            url = response.links.get("next", {}).get("url")
+            params = None
+
+    async def _get_json(self, url: str) -> dict:
+        response = await self.get(url)
+        return response.json()
+
+    async def get_commit(self, repo_name: str, sha: str) -> dict:
+        """Fetch one commit with its files; concurrent evaluations asking for the same SHA share one request."""
+        key = (repo_name, sha)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._get_json(f"/repos/{repo_name}/commits/{sha}"))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield : l'annulation d'un appelant ne doit pas annuler la requête des autres
+        return await asyncio.shield(task)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class GithubPool:
+    """
+    Process-wide pool of `AsyncGithub` clients, one per (event loop, token or tuple of tokens).
+
+    HTTP connections cannot be shared across event loops, so clients are kept
+    per loop; the sync `evaluate_challenge` wrapper runs on one long-lived loop
+    per thread, so its keep-alive connections survive between evaluations.
+    """
+
+    def __init__(self, base_url: str = API_URL, pool_size: int = POOL_SIZE,
+                 max_concurrency: int = FETCH_WORKERS, transport_factory=None):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        # Transport httpx de chaque nouveau client (enregistrement / rejeu, voir replay.py)
+        self.transport_factory = transport_factory
+        self._clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def client(self, token) -> AsyncGithub:
+        """Return the client for `token` (or a tuple of tokens) on the running event loop."""
+        if isinstance(token, list):
+            token = tuple(token)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._clients.setdefault(loop, {})
+            client = clients.get(token)
+            if client is None:
+                transport = self.transport_factory() if self.transport_factory else None
+                client = AsyncGithub(token, self.base_url, self.pool_size, self.max_concurrency,
+                                     transport=transport)
+                clients[token] = client
+            return client
+
+    def reset(self) -> None:
+        """Forget every client (they are not closed), e.g. after changing `transport_factory`."""
+        with self._lock:
+            self._clients = weakref.WeakKeyDictionary()
+
+    async def aclose(self) -> None:
+        """Close the clients of the running event loop."""
+        with self._lock:
+            clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+
+_pool = GithubPool()
+
+
+def get_pool() -> GithubPool:
+    return _pool
+
+
+def get_client(token) -> AsyncGithub:
+    return _pool.client(token)
@@ -0,0 +1,331 @@
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from commit_cache import CACHE_DIR
+
+# Nombre d'évaluations exécutées en parallèle par processus
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# "memory" (par défaut) ou "sqlite" (partagé entre les workers gunicorn)
+JOB_STORE = os.getenv("JOB_STORE", "memory")
+# Les jobs sont oubliés après ce délai sans mise à jour (secondes)
+JOB_TTL = float(os.getenv("JOB_TTL", "3600"))
+# Un job en attente ou en cours sans heartbeat depuis ce délai (secondes) est considéré
+# abandonné (worker gunicorn redémarré, processus tué) ; le processus qui le tient le
+# rafraîchit tous les JOB_LEASE / 6
+JOB_LEASE = float(os.getenv("JOB_LEASE", "60"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+ABANDONED_ERROR = "Job abandonné : le processus qui l'exécutait s'est arrêté."
+
+
+def job_key(params: dict) -> str:
+    """Identical requests get the same key, so in-flight duplicates share one job."""
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def _new_job(key: str, params: dict) -> dict:
+    now = time.time()
+    return {
+        "id": uuid.uuid4().hex,
+        "key": key,
+        "status": QUEUED,
+        "params": params,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "owner": os.getpid(),
+    }
+
+
+def _owner_alive(pid) -> bool:
+    """Whether the process `pid` (on this host) still exists."""
+    if pid is None or pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class InMemoryJobStore:
+    """Jobs kept in the process (default). Polls must reach the process that took the job."""
+
+    def __init__(self, ttl: float = JOB_TTL):
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create_or_get(self, key: str, params: dict) -> tuple[dict, bool]:
+        """Return `(job, created)`: the in-flight job with this key, or a new queued one."""
+        with self._lock:
+            self._prune()
+            for job in self._jobs.values():
+                if job["key"] == key and job["status"] in ACTIVE_STATUSES:
+                    return dict(job), False
+            job = _new_job(key, params)
+            self._jobs[job["id"]] = job
+            return dict(job), True
+
+    def get(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(fields, updated_at=time.time())
+
+    def touch(self, job_ids) -> None:
+        """Heartbeat of the jobs still queued or running in this process."""
+        now = time.time()
+        with self._lock:
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                if job and job["status"] in ACTIVE_STATUSES:
+                    job["updated_at"] = now
+
+    def _prune(self) -> None:
+        # Les jobs actifs ont un heartbeat : seul un job bloqué dépasse le TTL
+        limit = time.time() - self.ttl
+        for job_id in [j["id"] for j in self._jobs.values() if j["updated_at"] < limit]:
+            del self._jobs[job_id]
+
+
+class SQLiteJobStore:
+    """Jobs in a SQLite file, visible to every worker process on the host."""
+
+    def __init__(self, path: str = None, ttl: float = JOB_TTL, lease: float = JOB_LEASE):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "jobs.sqlite")
+        self.path = path
+        self.ttl = ttl
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                owner INTEGER
+            )"""
+        )
+        # Base créée avant l'ajout du propriétaire
+        if "owner" not in {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner INTEGER")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs (key, status)")
+
+    @staticmethod
+    def _row_to_job(row) -> dict:
+        return {
+            "id": row[0],
+            "key": row[1],
+            "status": row[2],
+            "params": json.loads(row[3]),
+            "result": json.loads(row[4]) if row[4] is not None else None,
+            "error": row[5],
+            "created_at": row[6],
+            "updated_at": row[7],
+            "owner": row[8],
+        }
+
+    def _stale(self, job: dict, now: float) -> bool:
+        """An active job whose process is gone or has stopped its heartbeat."""
+        return (job["status"] in ACTIVE_STATUSES
+                and (job["updated_at"] < now - self.lease or not _owner_alive(job["owner"])))
+
+    def create_or_get(self, key: str, params: dict) -> tuple[dict, bool]:
+        """
+        Return `(job, created)`. An abandoned job with the same key is taken
+        over (queued again in this process, same id, so its pollers get the
+        result); the other abandoned jobs are marked as failed.
+        """
+        with self._lock:
+            # BEGIN IMMEDIATE : la recherche + l'insertion sont atomiques entre processus
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                self._conn.execute("DELETE FROM jobs WHERE updated_at < ?", (now - self.ttl,))
+                active = [self._row_to_job(row) for row in self._conn.execute(
+                    "SELECT * FROM jobs WHERE status IN (?, ?)", ACTIVE_STATUSES)]
+                stale = [job for job in active if self._stale(job, now)]
+                live = [job for job in active if job["key"] == key and job not in stale]
+                taken = [job for job in stale if job["key"] == key and not live][:1]
+                for job in stale:
+                    if job not in taken:
+                        self._conn.execute("UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                                           (ERROR, ABANDONED_ERROR, now, job["id"]))
+                if live:
+                    self._conn.execute("COMMIT")
+                    return live[0], False
+                if taken:
+                    job = {**taken[0], "status": QUEUED, "error": None, "updated_at": now, "owner": os.getpid()}
+                    self._conn.execute("UPDATE jobs SET status = ?, error = NULL, updated_at = ?, owner = ? WHERE id = ?",
+                                       (QUEUED, now, job["owner"], job["id"]))
+                else:
+                    job = _new_job(key, params)
+                    self._conn.execute(
+                        "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (job["id"], key, job["status"], json.dumps(params), None, None,
+                         job["created_at"], job["updated_at"], job["owner"]),
+                    )
+                self._conn.execute("COMMIT")
+                return job, True
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get(self, job_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        job = self._row_to_job(row) if row else None
+        if job and self._stale(job, time.time()):
+            # Personne ne relancera ce job : ceux qui l'attendent reçoivent une erreur
+            self.update(job_id, status=ERROR, error=ABANDONED_ERROR)
+            job.update(status=ERROR, error=ABANDONED_ERROR)
+        return job
+
+    def update(self, job_id: str, **fields) -> None:
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def touch(self, job_ids) -> None:
+        """Heartbeat of the jobs still queued or running in this process."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET updated_at = ? WHERE owner = ? AND status IN (?, ?) "
+                f"AND id IN ({', '.join('?' * len(job_ids))})",
+                (time.time(), os.getpid(), *ACTIVE_STATUSES, *job_ids),
+            )
+
+
+def create_job_store(kind: str = JOB_STORE):
+    if kind == "memory":
+        return InMemoryJobStore()
+    if kind == "sqlite":
+        return SQLiteJobStore()
+    raise ValueError(f"Unknown job store: {kind}")
+
+
+class JobQueue:
+    """
+    Runs `run_fn(params)` on a bounded pool of background threads.
+
+    `submit` returns at once with the job (a new one, or the identical job
+    already in flight); `get` returns its status and, once done, its result.
+    When every worker is busy, queued jobs start by priority (lowest value first).
+    While this process holds jobs, a heartbeat thread refreshes them in the store.
+    """
+
+    def __init__(self, run_fn, store=None, max_workers: int = JOB_WORKERS):
+        self.run_fn = run_fn
+        self.store = store if store is not None else create_job_store()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="eval-job")
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._order = itertools.count()
+        self._held = set()
+        self._heartbeat = None
+        self._stopped = threading.Event()
+
+    def submit(self, params: dict, priority: int = 0) -> dict:
+        job, created = self.store.create_or_get(job_key(params), params)
+        if created:
+            with self._pending_lock:
+                heapq.heappush(self._pending, (priority, next(self._order), job["id"], params))
+                self._held.add(job["id"])
+                if self._heartbeat is None:
+                    self._heartbeat = threading.Thread(target=self._beat, name="eval-job-heartbeat", daemon=True)
+                    self._heartbeat.start()
+            # Chaque tâche du pool lance le job en attente le plus prioritaire, pas forcément le sien
+            self._executor.submit(self._run_next)
+        return job
+
+    def get(self, job_id: str):
+        return self.store.get(job_id)
+
+    def wait(self, job_id: str, timeout: float = None, poll_interval: float = 0.1):
+        """Block until the job is finished (or `timeout` expires) and return it."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None or job["status"] not in ACTIVE_STATUSES:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(poll_interval)
+
+    def _run_next(self) -> None:
+        with self._pending_lock:
+            _, _, job_id, params = heapq.heappop(self._pending)
+        self._run(job_id, params)
+
+    def _run(self, job_id: str, params: dict) -> None:
+        self.store.update(job_id, status=RUNNING)
+        try:
+            result = self.run_fn(params)
+        except Exception as e:
+            self.store.update(job_id, status=ERROR, error=str(e))
+        else:
+            self.store.update(job_id, status=DONE, result=result)
+        finally:
+            with self._pending_lock:
+                self._held.discard(job_id)
+
+    def _beat(self) -> None:
+        while not self._stopped.wait(JOB_LEASE / 6):
+            with self._pending_lock:
+                held = list(self._held)
+            if held:
+                try:
+                    self.store.touch(held)
+                except Exception:
+                    # Base verrouillée un instant : le prochain battement rattrapera
+                    pass
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+        self._stopped.set()
+
+
+def job_response(job: dict) -> dict:
+    """Public view of a job for the HTTP API."""
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "result": job["result"],
+        "error": job["error"],
+    }
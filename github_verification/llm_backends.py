@@ -0,0 +1,502 @@
+import asyncio
+import collections
+import hashlib
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import weakref
+
+from llm_stream import aread_until_verdict
+from prompt import OLLAMA_NUM_CTX
+
+SYSTEM_PROMPT = "Tu es un assistant expert en revue de code."
+
+# Timeout du health check d'un hôte Ollama (GET /api/version)
+OLLAMA_HEALTH_TIMEOUT = float(os.getenv("OLLAMA_HEALTH_TIMEOUT", "2"))
+
+DEFAULT_BACKENDS = {
+    "ollama": {"type": "ollama", "model": "qwen3:4b"},
+    "openai": {"type": "openai", "model": "gpt-4o"},
+    "fake": {"type": "fake"},
+}
+
+
+class CrossLoopSemaphore:
+    """
+    Semaphore shared by several event loops (each job worker thread runs its own).
+
+    `asyncio.Semaphore` is bound to one loop, so it cannot cap the calls a
+    backend receives from the whole process.
+    """
+
+    def __init__(self, value: int):
+        self._value = value
+        self._lock = threading.Lock()
+        self._waiters = collections.deque()
+        self.in_flight = 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                self.in_flight += 1
+                return
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if future.done() and not future.cancelled():
+                    # Le slot nous a été donné juste avant l'annulation : on le rend
+                    self._release_locked()
+                else:
+                    try:
+                        self._waiters.remove((loop, future))
+                    except ValueError:
+                        pass
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._release_locked()
+
+    def _release_locked(self) -> None:
+        self.in_flight -= 1
+        if self._waiters:
+            loop, future = self._waiters.popleft()
+            self.in_flight += 1
+            loop.call_soon_threadsafe(self._grant, future)
+        else:
+            self._value += 1
+
+    def _grant(self, future) -> None:
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+
+class LLMBackend:
+    """
+    An LLM endpoint with its own concurrency limit, timeout and retry policy.
+
+    A backend is itself an async `llm_function` (`await backend(prompt)`), and
+    its `model_id` identifies the model for the verdict cache and the prompt
+    budget. HTTP clients are kept per event loop so connections are reused.
+    """
+
+    kind = None
+
+    def __init__(self, name: str, model: str, max_concurrency: int = 2, timeout: float = 300.0,
+                 retries: int = 3, backoff: float = 1.0, max_backoff: float = 30.0):
+        self.name = name
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.slots = CrossLoopSemaphore(max_concurrency)
+        self._clients = weakref.WeakKeyDictionary()
+        self._clients_lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.kind}:{self.model}"
+
+    @property
+    def in_flight(self) -> int:
+        return self.slots.in_flight
+
+    @property
+    def queued(self) -> int:
+        return self.slots.queued
+
+    def client(self):
+        """The HTTP client of this backend for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._clients.get(loop)
+            if client is None:
+                client = self._clients[loop] = self._make_client()
+            return client
+
+    def _make_client(self):
+        return None
+
+    def is_retryable(self, error: Exception) -> bool:
+        import httpx
+
+        return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+    async def _complete(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def complete(self, prompt: str) -> str:
+        async with self.slots:
+            for attempt in range(self.retries + 1):
+                try:
+                    return await asyncio.wait_for(self._complete(prompt), self.timeout)
+                except Exception as e:
+                    if attempt == self.retries or not self.is_retryable(e):
+                        raise
+                # Backoff exponentiel avec "full jitter"
+                await asyncio.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+    async def __call__(self, prompt: str) -> str:
+        return await self.complete(prompt)
+
+
+class OllamaBackend(LLMBackend):
+    kind = "ollama"
+
+    def __init__(self, name: str, model: str = "qwen3:4b", host: str = None,
+                 num_ctx: int = OLLAMA_NUM_CTX, **options):
+        super().__init__(name, model, **options)
+        self.host = host
+        self.num_ctx = num_ctx
+
+    def _make_client(self):
+        from ollama import AsyncClient
+
+        return AsyncClient(host=self.host, timeout=self.timeout)
+
+    def is_retryable(self, error: Exception) -> bool:
+        from ollama import ResponseError
+
+        if isinstance(error, ResponseError):
+            return error.status_code == 429 or error.status_code >= 500
+        return isinstance(error, ConnectionError) or super().is_retryable(error)
+
+    async def _complete(self, prompt: str) -> str:
+        # Réponse en streaming, coupée dès que la NOTE est donnée
+        stream = await self.client().chat(model=self.model, messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ], options={"num_ctx": self.num_ctx}, stream=True)
+        try:
+            return await aread_until_verdict(part['message']['content'] async for part in stream)
+        finally:
+            await stream.aclose()
+
+
+def normalize_host(host: str) -> str:
+    host = host.rstrip("/")
+    return host if "://" in host else f"http://{host}"
+
+
+class OllamaEndpoint(OllamaBackend):
+    """One host of an OllamaPoolBackend, with its health state."""
+
+    def __init__(self, name: str, model: str, host: str, max_failures: int = 2,
+                 cooldown: float = 30.0, **options):
+        options["retries"] = 0  # le pool réessaie sur un autre hôte
+        super().__init__(name, model, host=normalize_host(host), **options)
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.healthy = True
+        self.checked = False
+        self.failures = 0
+        self.down_until = 0.0
+        self.served = 0
+        self.errors = 0
+        self._state_lock = threading.Lock()
+        self._checking = False
+
+    @property
+    def load(self) -> float:
+        """Outstanding requests (running + waiting) relative to the host capacity."""
+        return (self.in_flight + self.queued) / self.max_concurrency
+
+    def needs_check(self, now: float) -> bool:
+        return not self.checked or (not self.healthy and now >= self.down_until)
+
+    async def health_check(self) -> bool:
+        import httpx
+
+        with self._state_lock:
+            if self._checking:
+                return self.healthy
+            self._checking = True
+        try:
+            async with httpx.AsyncClient(timeout=OLLAMA_HEALTH_TIMEOUT) as client:
+                ok = (await client.get(f"{self.host}/api/version")).status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        with self._state_lock:
+            self._checking = False
+            self.checked = True
+            if ok:
+                self.healthy = True
+                self.failures = 0
+            else:
+                self._mark_down()
+        return ok
+
+    def record_success(self) -> None:
+        with self._state_lock:
+            self.served += 1
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._state_lock:
+            self.errors += 1
+            self.failures += 1
+            if self.failures >= self.max_failures:
+                self._mark_down()
+
+    def _mark_down(self) -> None:
+        # Plus de nouveaux prompts (les appels en cours se terminent) jusqu'au prochain health check
+        self.healthy = False
+        self.down_until = time.monotonic() + self.cooldown
+
+    def stats(self) -> dict:
+        return {
+            "host": self.host,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "served": self.served,
+            "errors": self.errors,
+        }
+
+
+class OllamaPoolBackend(LLMBackend):
+    """
+    Several Ollama hosts serving the same model behind one backend.
+
+    Prompts wait in the pool until some host has a free slot, then go to the
+    healthy host with the fewest outstanding requests relative to its capacity,
+    so a slow host gets fewer prompts instead of a longer queue. A host that fails `max_failures` calls in a row,
+    or its health check, is drained: it gets no new prompt until a health check
+    passes again, `cooldown` seconds later. A failed call is retried on another
+    host. `hosts` items are URLs or {"host": ..., "max_concurrency": ...}.
+    """
+
+    kind = "ollama"
+
+    def __init__(self, name: str, model: str = "qwen3:4b", hosts: list = None, max_concurrency: int = 2,
+                 max_failures: int = 2, cooldown: float = 30.0, num_ctx: int = OLLAMA_NUM_CTX, **options):
+        hosts = [h if isinstance(h, dict) else {"host": h} for h in hosts or ["127.0.0.1:11434"]]
+        capacity = sum(h.get("max_concurrency", max_concurrency) for h in hosts)
+        super().__init__(name, model, max_concurrency=capacity, **options)
+        self.endpoints = [
+            OllamaEndpoint(
+                f"{name}[{h['host']}]", model, h["host"],
+                max_concurrency=h.get("max_concurrency", max_concurrency),
+                max_failures=max_failures, cooldown=cooldown, num_ctx=num_ctx, timeout=self.timeout
+            )
+            for h in hosts
+        ]
+        self._rotation = itertools.count()
+
+    @property
+    def in_flight(self) -> int:
+        return sum(e.in_flight for e in self.endpoints)
+
+    @property
+    def queued(self) -> int:
+        return self.slots.queued + sum(e.queued for e in self.endpoints)
+
+    async def choose(self, exclude: list = ()) -> OllamaEndpoint:
+        now = time.monotonic()
+        stale = [e for e in self.endpoints if e.needs_check(now)]
+        if stale:
+            await asyncio.gather(*(e.health_check() for e in stale))
+        healthy = [e for e in self.endpoints if e.healthy]
+        if not healthy:
+            # Tous drainés : on revérifie tout de suite plutôt que d'attendre la fin du cooldown
+            await asyncio.gather(*(e.health_check() for e in self.endpoints))
+            healthy = [e for e in self.endpoints if e.healthy]
+            if not healthy:
+                raise ConnectionError(f"No healthy Ollama host for backend {self.name}")
+        candidates = [e for e in healthy if e not in exclude] or healthy
+        # Moins de requêtes en attente, et à égalité on tourne entre les hôtes
+        start = next(self._rotation)
+        rotated = candidates[start % len(candidates):] + candidates[:start % len(candidates)]
+        return min(rotated, key=lambda e: e.load)
+
+    async def complete(self, prompt: str) -> str:
+        # L'hôte est choisi une fois qu'un slot s'est libéré quelque part, pas à l'arrivée du prompt
+        async with self.slots:
+            tried = []
+            for attempt in range(self.retries + 1):
+                endpoint = await self.choose(exclude=tried)
+                try:
+                    result = await endpoint.complete(prompt)
+                except Exception as e:
+                    if not endpoint.is_retryable(e):
+                        raise
+                    endpoint.record_failure()
+                    if attempt == self.retries:
+                        raise
+                    tried.append(endpoint)
+                    if all(e in tried or not e.healthy for e in self.endpoints):
+                        await asyncio.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+                    continue
+                endpoint.record_success()
+                return result
+
+    def stats(self) -> list[dict]:
+        return [e.stats() for e in self.endpoints]
+
+
+class OpenAIBackend(LLMBackend):
+    kind = "openai"
+
+    def __init__(self, name: str, model: str = "gpt-4o", temperature: float = 0.7,
+                 max_tokens: int = 1000, **options):
+        super().__init__(name, model, **options)
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    def _make_client(self):
+        from openai import AsyncOpenAI
+
+        # Les retries sont gérés ici (avec jitter), pas par le SDK
+        return AsyncOpenAI(timeout=self.timeout, max_retries=0)  # uses OPENAI_API_KEY
+
+    def is_retryable(self, error: Exception) -> bool:
+        import openai
+
+        return isinstance(error, (openai.APIConnectionError, openai.RateLimitError,
+                                  openai.InternalServerError)) or super().is_retryable(error)
+
+    async def _complete(self, prompt: str) -> str:
+        stream = await self.client().chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True
+        )
+        try:
+            content = await aread_until_verdict(
+                chunk.choices[0].delta.content or "" async for chunk in stream if chunk.choices
+            )
+        finally:
+            await stream.close()
+        return content.strip()
+
+
+class FakeBackend(LLMBackend):
+    """Deterministic local backend for tests and benchmarks (no network)."""
+
+    kind = "fake"
+
+    def __init__(self, name: str, model: str = "fake", score: int = None, latency: float = 0.0, **options):
+        options.setdefault("max_concurrency", 64)
+        super().__init__(name, model, **options)
+        self.score = score
+        self.latency = latency
+
+    async def _complete(self, prompt: str) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()
+        score = self.score if self.score is not None else int(digest, 16) % 11
+        return (
+            f"- Résumé technique : réponse simulée ({digest[:12]}, {len(prompt)} caractères)\n"
+            f"- Évaluation :\n  - Correspondance: {'OUI' if score >= 7 else 'NON'}\n"
+            f"- NOTE: {score}\n"
+        )
+
+
+BACKEND_TYPES = {
+    "ollama": OllamaBackend,
+    "ollama_pool": OllamaPoolBackend,
+    "openai": OpenAIBackend,
+    "fake": FakeBackend,
+}
+
+
+def load_backend_config() -> dict:
+    """
+    Backends by name: the defaults, updated with the JSON file in LLM_BACKENDS_FILE
+    and the JSON in LLM_BACKENDS, e.g.
+    {"gpu1": {"type": "ollama", "host": "http://10.0.0.5:11434", "max_concurrency": 2}}
+    OLLAMA_HOSTS (comma separated) turns the "ollama" backend into a pool of hosts.
+    """
+    config = dict(DEFAULT_BACKENDS)
+    if os.getenv("OLLAMA_HOSTS"):
+        # Plusieurs serveurs Ollama : le backend "ollama" répartit les prompts entre eux
+        hosts = [h.strip() for h in os.getenv("OLLAMA_HOSTS").split(",") if h.strip()]
+        config["ollama"] = dict(config["ollama"], type="ollama_pool", hosts=hosts)
+    if os.getenv("LLM_BACKENDS_FILE"):
+        with open(os.getenv("LLM_BACKENDS_FILE")) as f:
+            config.update(json.load(f))
+    if os.getenv("LLM_BACKENDS"):
+        config.update(json.loads(os.getenv("LLM_BACKENDS")))
+    return config
+
+
+class BackendRegistry:
+    """Named LLM backends, built lazily from the configuration."""
+
+    def __init__(self, config: dict = None, default: str = None):
+        self.config = config if config is not None else load_backend_config()
+        # Backend utilisé quand la requête n'en précise pas
+        self.default = default or os.getenv("LLM_BACKEND", "ollama")
+        self._backends = {}
+        self._lock = threading.Lock()
+
+    def names(self) -> list[str]:
+        return list(self.config)
+
+    def register(self, backend: LLMBackend) -> None:
+        with self._lock:
+            self.config[backend.name] = {"type": backend.kind}
+            self._backends[backend.name] = backend
+
+    def get(self, name: str = None) -> LLMBackend:
+        name = name or self.default
+        with self._lock:
+            backend = self._backends.get(name)
+            if backend is None:
+                if name not in self.config:
+                    raise KeyError(f"Unknown LLM backend: {name}")
+                options = dict(self.config[name])
+                backend_type = BACKEND_TYPES[options.pop("type")]
+                backend = self._backends[name] = backend_type(name, **options)
+            return backend
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> BackendRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = BackendRegistry()
+        return _registry
+
+
+def is_known_backend(name: str = None) -> bool:
+    registry = get_registry()
+    return (name or registry.default) in registry.config
+
+
+def get_backend(name: str = None) -> LLMBackend:
+    """The backend called `name` (or the default one, LLM_BACKEND)."""
+    return get_registry().get(name)
@@ -0,0 +1,136 @@
+import re
+
+# "NOTE: X" valide, après la section Évaluation, suivi d'un caractère qui n'est
+# pas un chiffre (sinon "NOTE: 1" pourrait encore devenir "NOTE: 10").
+_VERDICT_RE = re.compile(r"Évaluation\s*:.*?NOTE\s*:\s*(10|[0-9])(?=\D)", re.IGNORECASE | re.DOTALL)
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+
+
+def visible_text(buffer: str) -> str:
+    """The answer without the model's reasoning (`<think>` blocks, even unfinished)."""
+    text = _THINK_RE.sub("", buffer)
+    unfinished = text.find("<think>")
+    return text if unfinished == -1 else text[:unfinished]
+
+
+def verdict_complete(buffer: str) -> bool:
+    """True once the answer contains the Évaluation section followed by a valid NOTE."""
+    return _VERDICT_RE.search(visible_text(buffer)) is not None
+
+
+_THINK_OPEN = "<think>"
+_THINK_CLOSE = "</think>"
+# Les deux moitiés de _VERDICT_RE, cherchées séparément dans le texte au fil du flux
+_EVALUATION_RE = re.compile(r"Évaluation\s*:", re.IGNORECASE)
+_NOTE_RE = re.compile(r"NOTE\s*:\s*(10|[0-9])(?=\D)", re.IGNORECASE)
+# Débuts de correspondance que les prochains tokens peuvent encore compléter
+_EVALUATION_WORD = re.compile(r"Évaluation", re.IGNORECASE)
+_EVALUATION_PENDING = re.compile(r"Évaluation\s*", re.IGNORECASE)
+_NOTE_WORD = re.compile(r"NOTE", re.IGNORECASE)
+_NOTE_PENDING = re.compile(r"NOTE\s*(?::\s*(?:10?|[0-9])?)?", re.IGNORECASE)
+
+
+def _partial_suffix(text: str, tag: str) -> int:
+    """Length of the longest end of `text` that starts `tag` (a tag split across tokens)."""
+    for k in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:k]):
+            return k
+    return 0
+
+
+def _pending_tail(text: str, word, pending) -> str:
+    """The end of `text` where a match may still begin: the last `word` if what follows can still complete it."""
+    last = None
+    for last in word.finditer(text):
+        pass
+    if last is not None and pending.fullmatch(text, last.start()):
+        return text[last.start():]
+    # Un mot coupé entre deux tokens ("NO" + "TE")
+    return text[-(len(word.pattern) - 1):]
+
+
+class VerdictWatcher:
+    """
+    Accumulates streamed tokens and tells when the verdict has been emitted.
+
+    Same answer as `verdict_complete` on the text so far, but each token is
+    scanned once: `<think>` blocks are skipped as they stream, and the
+    Évaluation / NOTE patterns are only searched in the new text (plus the
+    start of a match that the next tokens may complete).
+    """
+
+    def __init__(self):
+        self._parts = []
+        self.done = False
+        self._in_think = False
+        self._withheld = ""  # fin du texte brut qui commence peut-être une balise
+        self._tail = ""  # texte visible où une correspondance peut encore commencer
+        self._evaluation_seen = False
+
+    def feed(self, token: str) -> bool:
+        self._parts.append(token)
+        if not self.done and token:
+            self.done = self._scan(self._visible(token))
+        return self.done
+
+    def _visible(self, token: str) -> str:
+        """The text `token` adds outside `<think>` blocks."""
+        raw = self._withheld + token
+        out = []
+        while True:
+            if self._in_think:
+                end = raw.find(_THINK_CLOSE)
+                if end == -1:
+                    self._withheld = raw[-(len(_THINK_CLOSE) - 1):]
+                    break
+                raw = raw[end + len(_THINK_CLOSE):]
+                self._in_think = False
+            else:
+                start = raw.find(_THINK_OPEN)
+                if start == -1:
+                    keep = _partial_suffix(raw, _THINK_OPEN)
+                    out.append(raw[:len(raw) - keep])
+                    self._withheld = raw[len(raw) - keep:]
+                    break
+                out.append(raw[:start])
+                raw = raw[start + len(_THINK_OPEN):]
+                self._in_think = True
+        return "".join(out)
+
+    def _scan(self, visible: str) -> bool:
+        tail = self._tail + visible
+        if not self._evaluation_seen:
+            match = _EVALUATION_RE.search(tail)
+            if match is None:
+                self._tail = _pending_tail(tail, _EVALUATION_WORD, _EVALUATION_PENDING)
+                return False
+            self._evaluation_seen = True
+            tail = tail[match.end():]
+        # Un début de balise retenu compte comme le caractère qui suit la note (il est visible tant
+        # que la balise n'est pas complète, comme pour visible_text)
+        if _NOTE_RE.search(tail + ("" if self._in_think else self._withheld)):
+            return True
+        self._tail = _pending_tail(tail, _NOTE_WORD, _NOTE_PENDING)
+        return False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+
+def read_until_verdict(tokens) -> str:
+    """Consume a token iterator, stopping as soon as the verdict is complete."""
+    watcher = VerdictWatcher()
+    for token in tokens:
+        if watcher.feed(token):
+            break
+    return watcher.text
+
+
+async def aread_until_verdict(tokens) -> str:
+    """Async variant of `read_until_verdict`."""
+    watcher = VerdictWatcher()
+    async for token in tokens:
+        if watcher.feed(token):
+            break
+    return watcher.text
@@ -1,30 +1,53 @@
-from github import Github
-from datetime import datetime
-from dotenv import load_dotenv
-import os
-import re
-from ollama import chat, ChatResponse
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Access the GitHub token
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+from env import load_env
+
+if __name__ == "__main__":
+    # Script : le .env avant les modules qui lisent leur configuration à l'import
+    load_env()
+
+from datetime import datetime  # noqa: E402
+import asyncio  # noqa: E402
+import inspect  # noqa: E402
+import os  # noqa: E402
+import re  # noqa: E402
+import threading  # noqa: E402
+
+from commit_cache import get_commit_cache  # noqa: E402
+from checkpoints import covered_bound, get_checkpoint_store  # noqa: E402
+from commit_fetch import fetch_commit_data, fetch_commit_data_by_author  # noqa: E402
+from commit_stats import calculate_commit_stats, empty_commit_stats, file_extension, merge_stats  # noqa: E402
+from github_pool import get_client  # noqa: E402
+from llm_backends import get_backend  # noqa: E402
+from llm_stream import visible_text  # noqa: E402
+from map_reduce import format_reduce_prompt, get_chunk_cache, split_commits, summarize_chunks  # noqa: E402
+from metrics import (COMMITS, EVALUATIONS, FILES, LLM_CALLS, LLM_TOKENS, PROMPT_TOKENS, Timings,  # noqa: E402
+                     current_timings, span)
+from prescreen import PRESCREEN, prescreen as prescreen_commits  # noqa: E402
+from prompt import count_tokens, format_prompt  # noqa: E402
+from rate_limit import PRIORITIES, QuotaUsage, current_priority, current_usage  # noqa: E402
+from verdict_cache import get_verdict_cache, llm_identity, prompt_fingerprint  # noqa: E402
+
+# Les dépendances lourdes (httpx, ollama, dotenv, numpy) sont importées à la première
+# utilisation : importer ce module ne doit faire aucune I/O pour que les workers
+# Flask démarrent vite, même hors ligne.
+
+# Valeurs de l'exemple (voir __main__)
 REPO_NAME = "MaximeGloesener/demo"  # ex: "octocat/Hello-World"
 START_DATE = "2024-09-20"
 END_DATE = "2024-09-24"
 TARGET_AUTHOR = "MaximeGloesener"  # pour filtrer uniquement les commits de l'utilisateur
 
-# Connexion à l'API
-g = Github(GITHUB_TOKEN)
-repo = g.get_repo(REPO_NAME)
+# Nombre max d'appels LLM en parallèle pendant une évaluation en lot
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
 
-# Conversion des dates
-start = datetime.fromisoformat(START_DATE)
-end = datetime.fromisoformat(END_DATE)
+EVALUATION_MODES = ("auto", "single", "map_reduce")
 
-# Récupérer les commits
-commits = repo.get_commits(since=start, until=end)
+def get_github_tokens(github_token: str = None) -> tuple[str, ...]:
+    """`github_token`, else the GITHUB_TOKENS pool (comma separated), else GITHUB_TOKEN."""
+    load_env()
+    if github_token:
+        return (github_token,)
+    tokens = tuple(t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip())
+    return tokens or tuple(filter(None, [os.getenv("GITHUB_TOKEN")]))
 
 CODE_EXTENSIONS = {
     ".py", ".js", ".ts", ".java", ".cpp", ".c", ".cs", ".go",
@@ -33,83 +56,56 @@ CODE_EXTENSIONS = {
 }
 
 def is_code_file(filename: str) -> bool:
-    _, ext = os.path.splitext(filename)
-    return ext.lower() in CODE_EXTENSIONS
-
-def calculate_commit_stats(commit_data: list[dict]) -> dict:
-    """Calculate statistics from commit data."""
-    total_additions = 0
-    total_deletions = 0
-    total_files = 0
-    file_types = set()
-
-    for commit in commit_data:
-        for file in commit["files"]:
-            total_additions += file["additions"]
-            total_deletions += file["deletions"]
-            total_files += 1
-            _, ext = os.path.splitext(file["filename"])
-            file_types.add(ext.lower())
-
-    return {
-        "total_commits": len(commit_data),
-        "total_additions": total_additions,
-        "total_deletions": total_deletions,
-        "total_files": total_files,
-        "file_types": list(file_types)
-    }
-def format_prompt(challenge_description: str, commits: list[dict], start_date: str, end_date: str, stats: dict) -> str:
-    prompt = f"""Tu es un assistant expert en revue de code. Ton rôle est d'évaluer si un développeur a respecté un objectif annoncé dans un challenge de codage.
-
-*** OBJECTIF DU CHALLENGE ***
-🎯 L'objectif du challenge est le suivant:
-{challenge_description}
-
-*** CODE IMPLEMENTE ***
-📂 Voici les commits et les changements associés (fichiers de code uniquement) :
-"""
-
-    for commit in commits:
-        prompt += f"\n---\n🔐 Commit {commit['sha'][:7]} - {commit['date']}\n📝 Message: {commit['message']}\n"
-        for file in commit["files"]:
-            prompt += f"\n📄 Fichier: {file['filename']} (+{file['additions']} / -{file['deletions']})\n"
-            if file["patch"]:
-                prompt += f"diff\n{file['patch']}\n\n"
-
-    prompt += """
----
-
-Tu connais maintenant l'objectif du challenge, c'est-à-dire ce qui est attendu du développeur. Et tu connais également le code implémenté, pour savoir si le challenge est réussi ou non, tu vas suivre les étapes suivantes:
+    return file_extension(filename) in CODE_EXTENSIONS
 
-🧠 Étape 1 : Donne un **résumé technique clair** de ce qui a été fait dans le code (ce que le développeur a réellement produit).
+def update_commit_stats(stats: dict, new_commits: list[dict]) -> dict:
+    """Return `stats` updated with `new_commits` (no pass over the commits already counted)."""
+    return merge_stats(stats, calculate_commit_stats(new_commits))
 
-🧪 Étape 2 : Vérifie **si le travail accompli correspond exactement à l'objectif du challenge**.
-- Liste les mots-clés et concepts spécifiques de l'objectif du challenge
-- Liste les mots-clés et concepts spécifiques du résumé technique
-- Vérifie s'il y a une correspondance directe entre ces deux ensembles de concepts
-- Identifie clairement tout écart ou divergence entre le résumé technique et l'objectif
+def _commit_before(commit: dict, end: datetime) -> bool:
+    # Les dates GitHub sont en UTC ; les dates du challenge sont naïves (UTC aussi)
+    return datetime.fromisoformat(commit["date"]).replace(tzinfo=None) < end
 
-ATTENTION CRITIQUE: Tu dois faire une comparaison terme à terme entre l'objectif du challenge et le résumé technique. Pour qu'un challenge soit considéré comme respecté, le domaine technique et la fonctionnalité principale DOIVENT correspondre exactement.
-
-Exemples d'incompatibilité:
-- Si l'objectif mentionne "page web météo" et le code concerne "modèle de pruning", alors le challenge n'est PAS respecté.
-- Si l'objectif mentionne "API REST" et le code implémente "interface graphique", alors le challenge n'est PAS respecté.
-- Si l'objectif mentionne "base de données SQL" et le code implémente "stockage NoSQL", alors le challenge n'est PAS respecté.
-
-📊 Étape 3 : Donne une **note sur 10** uniquement si le code correspond à l'objectif. Sinon, donne une note de 0 et explique clairement pourquoi.
-
-Format obligatoire de ta réponse :
-
-- Résumé technique :
-- Évaluation :
-  - Mots-clés de l'objectif: [liste]
-  - Mots-clés du résumé: [liste]
-  - Correspondance: [OUI/NON avec explication]
-- NOTE: X
-"""
+async def collect_commit_data(client, repo_name: str, start_date: str, end_date: str, target_author: str,
+                              checkpoints=None) -> tuple[list[dict], dict]:
+    """
+    Return `(commit_data, stats)` for the window.
 
-    return prompt
+    With a `CheckpointStore`, the commits already gathered for the same
+    (repo, author, start_date) are reused and only the commits after the end of
+    the previously covered window are fetched; stats are updated incrementally.
+    A window that is still open (`end_date` not yet past) is only covered up to
+    `covered_bound`, so the commits made since are fetched by the next call.
+    """
+    start = datetime.fromisoformat(start_date)
+    end = datetime.fromisoformat(end_date)
 
+    async def fetch(since: datetime) -> list[dict]:
+        return await fetch_commit_data(client, repo_name, since, end, target_author,
+                                       file_filter=is_code_file, cache=get_commit_cache())
+
+    checkpoint = checkpoints.get(repo_name, target_author, start_date) if checkpoints else None
+    if checkpoint is None:
+        commit_data = await fetch(start)
+        stats = calculate_commit_stats(commit_data)
+    else:
+        covered_until = datetime.fromisoformat(checkpoint["covered_until"])
+        if end == covered_until:
+            return checkpoint["commit_data"], checkpoint["stats"]
+        if end < covered_until:
+            # Fenêtre plus courte que le checkpoint : on filtre sans toucher au réseau
+            commit_data = [c for c in checkpoint["commit_data"] if _commit_before(c, end)]
+            return commit_data, calculate_commit_stats(commit_data)
+        # Les commits déjà vus après covered_until (fenêtre encore ouverte) sont dédoublonnés par sha
+        known = {c["sha"] for c in checkpoint["commit_data"]}
+        new_commits = [c for c in await fetch(covered_until) if c["sha"] not in known]
+        commit_data = new_commits + checkpoint["commit_data"]
+        stats = update_commit_stats(checkpoint["stats"], new_commits)
+
+    if checkpoints:
+        checkpoints.put(repo_name, target_author, start_date, covered_bound(start, end).isoformat(),
+                        commit_data, stats)
+    return commit_data, stats
 
 def extract_score(llm_response: str) -> int:
     match = re.search(r"NOTE:\s*([0-9]|10)\b", llm_response)
@@ -121,6 +117,8 @@ def extract_score(llm_response: str) -> int:
     return None
 
 def extract_summary(llm_response: str) -> dict:
+    # Le raisonnement de qwen3 (<think>) peut contenir des "NOTE:" intermédiaires
+    llm_response = visible_text(llm_response)
     parts = re.split(r"(Résumé technique\s*:|Évaluation\s*:|NOTE\s*:)", llm_response, flags=re.IGNORECASE)
     return {
         "summary": parts[2].strip() if len(parts) >= 6 else "",
@@ -128,25 +126,137 @@ def extract_summary(llm_response: str) -> dict:
         "score": extract_score(llm_response)
     }
 
-def ask_ollama(prompt: str) -> str:
-    response: ChatResponse = chat(model='qwen3:4b', messages=[
-        {"role": "system", "content": "Tu es un assistant expert en revue de code."},
-        {"role": "user", "content": prompt}
-    ])
-    return response['message']['content']
+async def call_llm(llm_function, prompt: str, prompt_tokens: int = None) -> str:
+    """
+    Await an async LLM function (or backend), or run a blocking one in a thread.
 
-def evaluate_challenge(
+    Counted in the metrics (time, tokens in and out); pass `prompt_tokens` when
+    the prompt has already been counted.
+    """
+    with span("llm_inference"):
+        if inspect.iscoroutinefunction(llm_function) or inspect.iscoroutinefunction(getattr(llm_function, "__call__", None)):
+            response = await llm_function(prompt)
+        else:
+            response = await asyncio.to_thread(llm_function, prompt)
+    model = llm_identity(llm_function)
+    LLM_CALLS.inc()
+    LLM_TOKENS.inc(prompt_tokens if prompt_tokens is not None else count_tokens(prompt, model), direction="in")
+    LLM_TOKENS.inc(count_tokens(response, model), direction="out")
+    return response
+
+def no_commit_result() -> dict:
+    return {
+        "summary": "Aucun commit trouvé dans la période spécifiée.",
+        "evaluation": "Le challenge n'a pas été complété car aucun commit n'a été effectué pendant la période donnée.",
+        "score": 0,
+        "stats": empty_commit_stats(),
+        "cached": False,
+        "prescreened": False
+    }
+
+def record_evaluation(commit_data: list[dict], result: dict) -> None:
+    """Count an evaluation (by outcome), its commits and its files in the metrics."""
+    COMMITS.inc(len(commit_data))
+    FILES.inc(sum(len(commit["files"]) for commit in commit_data))
+    if not commit_data:
+        outcome = "no_commits"
+    elif result["prescreened"]:
+        outcome = "prescreened"
+    elif result["cached"]:
+        outcome = "cached"
+    else:
+        outcome = "llm"
+    EVALUATIONS.inc(outcome=outcome)
+
+async def judge_commits(challenge_description: str, commit_data: list[dict], stats: dict,
+                        start_date: str, end_date: str, llm_function: callable = None,
+                        refresh: bool = False, mode: str = "auto", prescreen: bool = PRESCREEN) -> dict:
+    """
+    Ask the LLM (or the verdict cache) whether `commit_data` meets the challenge.
+
+    `mode` is "single" (one prompt, diffs trimmed to the model's budget),
+    "map_reduce" (summarize chunks of commits in parallel, then judge the
+    summaries) or "auto" (map-reduce only when the commits do not fit in one prompt).
+    With `prescreen`, obvious failures (tiny diff, other technologies and
+    unrelated code) get 0 without calling the LLM (see prescreen.py).
+    """
+    if mode not in EVALUATION_MODES:
+        raise ValueError(f"Unknown evaluation mode: {mode}")
+
+    if prescreen:
+        with span("prescreen"):
+            rejected = prescreen_commits(challenge_description, commit_data, stats)
+        if rejected is not None:
+            return rejected
+
+    llm_function = llm_function or get_backend()
+
+    # Le prompt est construit pour tenir dans le contexte du modèle visé
+    model = llm_identity(llm_function)
+    with span("prompt_build"):
+        chunks = split_commits(commit_data, model) if mode != "single" else [commit_data]
+    if mode == "map_reduce" or len(chunks) > 1:
+        summaries = await summarize_chunks(chunks, model, lambda p: call_llm(llm_function, p),
+                                           cache=get_chunk_cache())
+        with span("prompt_build"):
+            prompt = format_reduce_prompt(challenge_description, chunks, summaries, model=model)
+    else:
+        with span("prompt_build"):
+            prompt = format_prompt(challenge_description, commit_data, start_date, end_date, stats, model=model)
+    prompt_tokens = count_tokens(prompt, model)
+    PROMPT_TOKENS.inc(prompt_tokens)
+
+    # Même prompt + même modèle => même verdict : on évite un appel LLM
+    verdicts = get_verdict_cache()
+    fingerprint = prompt_fingerprint(prompt, model)
+    if not refresh:
+        cached = verdicts.get(fingerprint)
+        if cached is not None:
+            cached['cached'] = True
+            cached['prescreened'] = False
+            return cached
+
+    response = await call_llm(llm_function, prompt, prompt_tokens)
+    with span("parsing"):
+        result = extract_summary(response)
+
+    # Validation supplémentaire pour s'assurer que le score est cohérent
+    valid = result['score'] is not None and 0 <= result['score'] <= 10
+    if not valid:
+        result['score'] = 0
+        result['evaluation'] = "Erreur dans l'évaluation. Score invalide détecté."
+
+    # Ajouter les statistiques au résultat
+    result['stats'] = stats
+
+    if valid:
+        verdicts.put(fingerprint, model, result)
+    result['cached'] = False
+    result['prescreened'] = False
+
+    return result
+
+async def evaluate_challenge_async(
     repo_name: str,
     start_date: str,
     end_date: str,
     target_author: str,
     challenge_description: str,
     github_token: str = None,
-    llm_function: callable = ask_ollama
+    llm_function: callable = None,
+    incremental: bool = True,
+    refresh: bool = False,
+    mode: str = "auto",
+    prescreen: bool = PRESCREEN,
+    priority: str = "normal"
 ) -> dict:
     """
     Evaluate a coding challenge based on GitHub commits.
 
+    GitHub requests go through a shared async client (commit details are fetched
+    concurrently while the listing streams in) and the LLM call is awaited, so
+    one process can run many evaluations at once.
+
     Args:
         repo_name: GitHub repository name (format: "owner/repo")
         start_date: Start date in ISO format (YYYY-MM-DD)
@@ -154,82 +264,234 @@ def evaluate_challenge(
         target_author: GitHub username to filter commits
         challenge_description: Description of the coding challenge
         github_token: GitHub API token (optional if set in .env)
-        llm_function: Function to use for LLM calls (defaults to ask_ollama)
+        llm_function: Function or backend to use for LLM calls (defaults to the
+            LLM_BACKEND backend, see llm_backends.py); async functions are
+            awaited, blocking ones run in a thread
+        incremental: Reuse the checkpoint of a previous evaluation of the same
+            (repo, author, start_date) and only fetch the newer commits
+        refresh: Ignore a cached verdict for the same prompt and model and ask
+            the LLM again
+        mode: "auto", "single" or "map_reduce" (see `judge_commits`)
+        prescreen: Give 0 without calling the LLM when the commits obviously
+            do not meet the challenge (see prescreen.py)
+        priority: "high", "normal" or "low"; when GitHub quota runs low, lower
+            priorities wait first (see rate_limit.py)
 
     Returns:
-        dict: Contains summary, evaluation, score, and statistics
+        dict: Contains summary, evaluation, score, statistics, `cached`
+            (True when the verdict was reused from the verdict cache),
+            `prescreened` (True when the LLM was skipped), `github_quota`
+            (GitHub requests made and quota left) and `timings` (milliseconds
+            spent per stage, see metrics.py)
     """
-    token = github_token or os.getenv("GITHUB_TOKEN")
-    if not token:
+    tokens = get_github_tokens(github_token)
+    if not tokens:
         raise ValueError("GitHub token is required")
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {priority}")
+
+    # Lus par le client GitHub pour toutes les requêtes de cette évaluation
+    current_priority.set(priority)
+    usage = QuotaUsage()
+    current_usage.set(usage)
+    timings = Timings()
+    current_timings.set(timings)
+
+    try:
+        with span("total"):
+            commit_data, stats = await collect_commit_data(
+                get_client(tokens), repo_name, start_date, end_date, target_author,
+                checkpoints=get_checkpoint_store() if incremental else None
+            )
+
+            # Si aucun commit n'est trouvé, retourner un résultat d'échec
+            if not commit_data:
+                result = no_commit_result()
+            else:
+                result = await judge_commits(challenge_description, commit_data, stats, start_date, end_date,
+                                             llm_function=llm_function, refresh=refresh, mode=mode,
+                                             prescreen=prescreen)
+    except Exception:
+        EVALUATIONS.inc(outcome="error")
+        raise
+    record_evaluation(commit_data, result)
+    result['github_quota'] = usage.summary()
+    result['timings'] = timings.summary()
+    return result
 
-    g = Github(token)
-    repo = g.get_repo(repo_name)
-    start = datetime.fromisoformat(start_date)
-    end = datetime.fromisoformat(end_date)
-    commits = repo.get_commits(since=start, until=end)
-
-    commit_data = []
-    for commit in commits:
-        if commit.author and commit.author.login == target_author:
-            files = [
-                {
-                    "filename": file.filename,
-                    "additions": file.additions,
-                    "deletions": file.deletions,
-                    "patch": file.patch
-                }
-                for file in commit.files
-                if is_code_file(file.filename)
-            ]
-
-            if files:
-                commit_data.append({
-                    "sha": commit.sha,
-                    "date": commit.commit.author.date.isoformat(),
-                    "message": commit.commit.message,
-                    "files": files
-                })
-
-    # Si aucun commit n'est trouvé, retourner un résultat d'échec
-    if not commit_data:
-        return {
-            "summary": "Aucun commit trouvé dans la période spécifiée.",
-            "evaluation": "Le challenge n'a pas été complété car aucun commit n'a été effectué pendant la période donnée.",
-            "score": 0,
-            "stats": {
-                "total_commits": 0,
-                "total_additions": 0,
-                "total_deletions": 0,
-                "total_files": 0,
-                "file_types": []
-            }
-        }
-
-    # Calculer les statistiques
-    stats = calculate_commit_stats(commit_data)
-
-    prompt = format_prompt(challenge_description, commit_data, start_date, end_date, stats)
-    response = llm_function(prompt)
-    result = extract_summary(response)
+_thread_state = threading.local()
 
-    # Validation supplémentaire pour s'assurer que le score est cohérent
-    if result['score'] is None or not (0 <= result['score'] <= 10):
-        result['score'] = 0
-        result['evaluation'] = "Erreur dans l'évaluation. Score invalide détecté."
+def _run_sync(coro):
+    """
+    Run `coro` on this thread's own event loop.
 
-    # Ajouter les statistiques au résultat
-    result['stats'] = stats
+    The loop is kept between calls (instead of `asyncio.run`) so the pooled
+    GitHub connections, which are bound to a loop, are reused.
+    """
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _thread_state.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coro)
 
-    return result
+def evaluate_challenge(
+    repo_name: str,
+    start_date: str,
+    end_date: str,
+    target_author: str,
+    challenge_description: str,
+    github_token: str = None,
+    llm_function: callable = None,
+    incremental: bool = True,
+    refresh: bool = False,
+    mode: str = "auto",
+    prescreen: bool = PRESCREEN,
+    priority: str = "normal"
+) -> dict:
+    """Blocking wrapper around `evaluate_challenge_async` (same arguments and result)."""
+    return _run_sync(evaluate_challenge_async(
+        repo_name=repo_name,
+        start_date=start_date,
+        end_date=end_date,
+        target_author=target_author,
+        challenge_description=challenge_description,
+        github_token=github_token,
+        llm_function=llm_function,
+        incremental=incremental,
+        refresh=refresh,
+        mode=mode,
+        prescreen=prescreen,
+        priority=priority
+    ))
+
+async def evaluate_challenges_batch_async(
+    participants: list[tuple[str, str]],
+    start_date: str,
+    end_date: str,
+    challenge_description: str,
+    github_token: str = None,
+    llm_function: callable = None,
+    max_concurrency: int = BATCH_LLM_CONCURRENCY,
+    refresh: bool = False,
+    mode: str = "auto",
+    prescreen: bool = PRESCREEN,
+    priority: str = "low"
+):
+    """
+    Evaluate every participant of a challenge, yielding each result as soon as it is ready.
+
+    Participants are grouped by repository so each repo's commits are listed
+    once for all its authors; at most `max_concurrency` LLM calls run at a time.
+
+    Args:
+        participants: `(repo_name, target_author)` pairs sharing the same challenge
+        start_date, end_date, challenge_description, github_token, llm_function,
+        refresh, mode, prescreen, priority: as for `evaluate_challenge_async`
+            (a batch is "low" priority by default)
+        max_concurrency: Maximum number of LLM calls in parallel
+
+    Yields:
+        dict: `repo_name`, `target_author` and either the evaluation result or an `error`;
+            `github_quota` is the quota used to fetch the participant's repo
+            (shared by the participants of the same repo), and so are the
+            GitHub stages of `timings`
+    """
+    tokens = get_github_tokens(github_token)
+    if not tokens:
+        raise ValueError("GitHub token is required")
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {priority}")
+
+    client = get_client(tokens)
+    start = datetime.fromisoformat(start_date)
+    end = datetime.fromisoformat(end_date)
+    llm_slots = asyncio.Semaphore(max_concurrency)
+
+    authors_by_repo = {}
+    for repo_name, target_author in participants:
+        authors_by_repo.setdefault(repo_name, []).append(target_author)
+
+    async def fetch_repo(repo_name: str, authors: list[str]) -> tuple[dict, QuotaUsage, Timings]:
+        # Chaque tâche a sa copie du contexte : priorité et compteurs propres au repo
+        current_priority.set(priority)
+        usage = QuotaUsage()
+        current_usage.set(usage)
+        timings = Timings()
+        current_timings.set(timings)
+        commit_data = await fetch_commit_data_by_author(client, repo_name, start, end, authors,
+                                                        file_filter=is_code_file, cache=get_commit_cache())
+        return commit_data, usage, timings
+
+    repo_tasks = {
+        repo_name: asyncio.ensure_future(fetch_repo(repo_name, authors))
+        for repo_name, authors in authors_by_repo.items()
+    }
+
+    async def evaluate_participant(repo_name: str, target_author: str) -> dict:
+        timings = Timings()
+        current_timings.set(timings)
+        try:
+            commit_data_by_author, usage, repo_timings = await repo_tasks[repo_name]
+            commit_data = commit_data_by_author[target_author]
+            if not commit_data:
+                result = no_commit_result()
+            else:
+                stats = calculate_commit_stats(commit_data)
+                async with llm_slots:
+                    result = await judge_commits(challenge_description, commit_data, stats, start_date, end_date,
+                                                 llm_function=llm_function, refresh=refresh, mode=mode,
+                                                 prescreen=prescreen)
+        except Exception as e:
+            EVALUATIONS.inc(outcome="error")
+            return {"repo_name": repo_name, "target_author": target_author, "error": str(e)}
+        record_evaluation(commit_data, result)
+        return {"repo_name": repo_name, "target_author": target_author, **result,
+                "github_quota": usage.summary(), "timings": {**repo_timings.summary(), **timings.summary()}}
+
+    tasks = [asyncio.ensure_future(evaluate_participant(repo_name, target_author))
+             for repo_name, target_author in participants]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks + list(repo_tasks.values()):
+            task.cancel()
+
+def evaluate_challenges_batch(
+    participants: list[tuple[str, str]],
+    start_date: str,
+    end_date: str,
+    challenge_description: str,
+    github_token: str = None,
+    llm_function: callable = None,
+    max_concurrency: int = BATCH_LLM_CONCURRENCY,
+    refresh: bool = False,
+    mode: str = "auto",
+    prescreen: bool = PRESCREEN,
+    priority: str = "low"
+):
+    """Blocking generator around `evaluate_challenges_batch_async` (same arguments, same items)."""
+    results = evaluate_challenges_batch_async(
+        participants, start_date, end_date, challenge_description,
+        github_token=github_token, llm_function=llm_function,
+        max_concurrency=max_concurrency, refresh=refresh, mode=mode, prescreen=prescreen,
+        priority=priority
+    )
+    try:
+        while True:
+            try:
+                yield _run_sync(results.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        _run_sync(results.aclose())
 
 # Example usage:
 if __name__ == "__main__":
     result = evaluate_challenge(
-        repo_name="MaximeGloesener/demo",
+        repo_name=REPO_NAME,
         start_date="2024-09-10",
-        end_date="2024-09-24",
-        target_author="MaximeGloesener",
+        end_date=END_DATE,
+        target_author=TARGET_AUTHOR,
         challenge_description="faire une application qui fait la météo en react JS"
     )
 
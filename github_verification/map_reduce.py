@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import os
+import threading
+
+from commit_cache import CACHE_DIR
+from llm_stream import visible_text
+from prompt import (PROMPT_INSTRUCTIONS, SUMMARY_RESERVE_TOKENS, commit_tokens, get_token_counter,
+                    iter_budgeted, prompt_token_budget)
+from verdict_cache import VerdictCache
+
+# Nombre de résumés de parties demandés au LLM en parallèle
+MAP_REDUCE_CONCURRENCY = int(os.getenv("MAP_REDUCE_CONCURRENCY", "4"))
+# Durée de validité d'un résumé de partie (secondes, 30 jours par défaut)
+CHUNK_SUMMARY_TTL = float(os.getenv("CHUNK_SUMMARY_TTL", str(30 * 24 * 3600)))
+
+CHUNK_PROMPT_HEADER = """Tu es un assistant expert en revue de code. Voici une partie des commits d'un développeur et les changements associés (fichiers de code uniquement) :
+"""
+
+CHUNK_PROMPT_INSTRUCTIONS = """
+---
+
+Donne un **résumé technique** de ces changements : fonctionnalités implémentées, technologies et bibliothèques utilisées, fichiers principaux. Sois factuel et concis (15 lignes maximum). Ne donne pas de note.
+"""
+
+REDUCE_PROMPT_HEADER = """Tu es un assistant expert en revue de code. Ton rôle est d'évaluer si un développeur a respecté un objectif annoncé dans un challenge de codage.
+
+*** OBJECTIF DU CHALLENGE ***
+🎯 L'objectif du challenge est le suivant:
+{challenge_description}
+
+*** CODE IMPLEMENTE ***
+📂 Le code est trop volumineux pour être montré en entier. Voici le résumé technique des commits, partie par partie (de la plus ancienne à la plus récente) :
+"""
+
+
+def split_commits(commits: list[dict], model: str) -> list[list[dict]]:
+    """
+    Split `commits` (newest first) into chunks that each fit the model's budget.
+
+    Chunks are filled from the oldest commit on, so when newer commits are added
+    only the last chunk changes and the others keep the same SHA set (and their
+    cached summary). A commit too big for a chunk gets a chunk of its own and is
+    trimmed when rendered.
+    """
+    count = get_token_counter(model)
+    budget = (prompt_token_budget(model) - count(CHUNK_PROMPT_HEADER)
+              - count(CHUNK_PROMPT_INSTRUCTIONS) - SUMMARY_RESERVE_TOKENS)
+    chunks = []
+    current, used = [], 0
+    for commit in reversed(commits):
+        cost = commit_tokens(commit, count)
+        if current and used + cost > budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(commit)
+        used += cost
+    if current:
+        chunks.append(current)
+    # Dans chaque partie, les commits restent du plus récent au plus ancien
+    return [list(reversed(chunk)) for chunk in chunks]
+
+
+def chunk_fingerprint(chunk: list[dict], model: str) -> str:
+    h = hashlib.sha256()
+    h.update(model.encode())
+    for sha in sorted(commit["sha"] for commit in chunk):
+        h.update(b"\0")
+        h.update(sha.encode())
+    return h.hexdigest()
+
+
+def format_chunk_prompt(chunk: list[dict], model: str) -> str:
+    return "".join(iter_budgeted(CHUNK_PROMPT_HEADER, chunk, CHUNK_PROMPT_INSTRUCTIONS, model))
+
+
+def format_part(i: int, n: int, chunk: list[dict], summary: str) -> str:
+    first, last = chunk[-1], chunk[0]
+    return (
+        f"\n---\n🧩 Partie {i}/{n} : {len(chunk)} commit(s), "
+        f"du {first['date']} ({first['sha'][:7]}) au {last['date']} ({last['sha'][:7]})\n{summary}\n"
+    )
+
+
+def chunk_churn(chunk: list[dict]) -> int:
+    return sum(file["additions"] + file["deletions"] for commit in chunk for file in commit["files"])
+
+
+def select_parts(parts: list[str], chunks: list[list[dict]], budget: int, model: str) -> set:
+    """Indexes of the parts that fit in `budget` tokens, largest chunks first (as `prompt.select_files`)."""
+    count = get_token_counter(model)
+    selected = set()
+    remaining = budget
+    for i in sorted(range(len(parts)), key=lambda i: (-chunk_churn(chunks[i]), i)):
+        cost = count(parts[i])
+        if cost <= remaining:
+            selected.add(i)
+            remaining -= cost
+    return selected
+
+
+def format_omitted_parts(omitted: list[int], chunks: list[list[dict]]) -> str:
+    """Short recap of the parts left out of the reduce prompt."""
+    if not omitted:
+        return ""
+    # Taille fixe (pas de liste des parties) : le récapitulatif doit tenir dans SUMMARY_RESERVE_TOKENS
+    commits = sum(len(chunks[i]) for i in omitted)
+    first = min(chunks[i][-1]["date"] for i in omitted)
+    last = max(chunks[i][0]["date"] for i in omitted)
+    return (f"\n---\nℹ️ {len(omitted)} partie(s) plus petites non incluses faute de place : "
+            f"{commits} commit(s), du {first} au {last}\n")
+
+
+def format_reduce_prompt(challenge_description: str, chunks: list[list[dict]], summaries: list[str],
+                         model: str = None) -> str:
+    """
+    Final judgement prompt over the chunk summaries (same instructions and NOTE format).
+
+    With a model id, the summaries are kept within the model's prompt budget like
+    the diffs of `prompt.iter_budgeted`: the header and the instructions are
+    always kept, the parts of the largest chunks first, and the others are listed.
+    """
+    header = REDUCE_PROMPT_HEADER.format(challenge_description=challenge_description)
+    parts = [format_part(i, len(chunks), chunk, summary)
+             for i, (chunk, summary) in enumerate(zip(chunks, summaries), 1)]
+    selected = set(range(len(parts)))
+    if model is not None:
+        count = get_token_counter(model)
+        budget = prompt_token_budget(model) - count(header) - count(PROMPT_INSTRUCTIONS) - SUMMARY_RESERVE_TOKENS
+        selected = select_parts(parts, chunks, max(budget, 0), model)
+    omitted = [i for i in range(len(parts)) if i not in selected]
+    return "".join([header, *(part for i, part in enumerate(parts) if i in selected),
+                    format_omitted_parts(omitted, chunks), PROMPT_INSTRUCTIONS])
+
+
+def clean_summary(response: str) -> str:
+    # qwen3 renvoie son raisonnement entre <think> ... </think>
+    return visible_text(response).strip()
+
+
+async def summarize_chunks(chunks: list[list[dict]], model: str, ask, cache=None,
+                           max_concurrency: int = MAP_REDUCE_CONCURRENCY) -> list[str]:
+    """
+    Summarize each chunk with `ask(prompt)` (an async LLM call), in parallel.
+
+    Summaries are cached by the chunk's SHA set and the model, so a later
+    evaluation only summarizes the chunks that changed.
+    """
+    slots = asyncio.Semaphore(max_concurrency)
+
+    async def summarize(chunk: list[dict]) -> str:
+        fingerprint = chunk_fingerprint(chunk, model)
+        cached = cache.get(fingerprint) if cache else None
+        if cached is not None:
+            return cached["summary"]
+        async with slots:
+            summary = clean_summary(await ask(format_chunk_prompt(chunk, model)))
+        if cache:
+            cache.put(fingerprint, model, {"summary": summary})
+        return summary
+
+    return list(await asyncio.gather(*(summarize(chunk) for chunk in chunks)))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_chunk_cache() -> VerdictCache:
+    """Process-wide cache of chunk summaries, opened on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            _cache = VerdictCache(os.path.join(CACHE_DIR, "chunk_summaries.sqlite"), ttl=CHUNK_SUMMARY_TTL)
+        return _cache
@@ -0,0 +1,224 @@
+"""
+Per-stage timings and counters of the evaluator, in the Prometheus text format.
+
+Each stage of an evaluation (GitHub listing, commit fetches, pre-filter,
+prompt building, LLM inference, parsing) runs inside `span(stage)`, which feeds
+the `evaluator_stage_seconds` histogram and, when the evaluation has set
+`current_timings`, its own `Timings` (returned as `timings` in its result).
+The caches, the pre-filter and the GitHub governor keep their own counters;
+`render()` reads them when `/metrics` is scraped.
+
+Metrics live in the process: with several gunicorn workers, each worker
+exposes its own values.
+"""
+import contextlib
+import contextvars
+import threading
+import time
+
+# Bornes des histogrammes de durée (secondes) : de la requête GitHub à l'inférence LLM
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Temps par étape de l'évaluation en cours (propagé aux tâches qu'elle crée)
+current_timings = contextvars.ContextVar("evaluation_timings", default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_sample(name: str, labels: dict, value) -> str:
+    if labels:
+        name += "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+    return f"{name} {value:.6g}" if isinstance(value, float) else f"{name} {value}"
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """`(name, labels, value)` for each exposed series."""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # [compte par borne (non cumulé), somme, nombre d'observations]
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            values = sorted((key, (list(counts), total, n)) for key, (counts, total, n) in self._values.items())
+        for key, (counts, total, n) in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": f"{bound:g}"}, cumulative
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, n
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, n
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """Register `fn() -> [(name, type, help, [(labels, value), ...]), ...]`, read at each render."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(format_sample(*sample) for sample in metric.samples())
+        for collect in self._collectors:
+            for name, kind, help, samples in collect():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(format_sample(name, labels, value) for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "evaluator_stage_seconds", "Time spent in each stage of an evaluation.", ("stage",)
+)
+EVALUATIONS = REGISTRY.counter(
+    "evaluator_evaluations_total",
+    "Evaluations by outcome (llm, cached, prescreened, no_commits, error).", ("outcome",)
+)
+COMMITS = REGISTRY.counter("evaluator_commits_total", "Commits evaluated (after filtering).")
+FILES = REGISTRY.counter("evaluator_files_total", "Changed code files evaluated.")
+PROMPT_TOKENS = REGISTRY.counter("evaluator_prompt_tokens_total", "Tokens of the judge prompts built.")
+LLM_CALLS = REGISTRY.counter("evaluator_llm_calls_total", "LLM calls (judge and map-reduce summaries).")
+LLM_TOKENS = REGISTRY.counter(
+    "evaluator_llm_tokens_total", "Tokens sent to (in) and received from (out) the LLM.", ("direction",)
+)
+
+
+class Timings:
+    """Seconds spent per stage by one evaluation (summed over concurrent calls, e.g. map-reduce)."""
+
+    def __init__(self):
+        self.seconds = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {stage: round(1000 * seconds, 2) for stage, seconds in self.seconds.items()}
+
+
+def record_span(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = current_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextlib.contextmanager
+def span(stage: str):
+    """Time the block as `stage` (also on failure: a stage that times out is the slow one)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(stage, time.perf_counter() - start)
+
+
+@REGISTRY.collector
+def component_metrics():
+    """Counters kept by the caches, the pre-filter and the GitHub governor."""
+    from commit_cache import get_commit_cache
+    from map_reduce import get_chunk_cache
+    from prescreen import prescreen_stats
+    from rate_limit import get_governor
+    from verdict_cache import get_verdict_cache
+
+    caches = {"commit": get_commit_cache().stats(), "verdict": get_verdict_cache().stats(),
+              "chunk_summary": get_chunk_cache().stats()}
+    screened = prescreen_stats()
+    quota = get_governor().stats()
+    return [
+        ("evaluator_cache_hits_total", "counter", "Cache hits (commit files, verdicts, chunk summaries).",
+         [({"cache": name}, stats["hits"]) for name, stats in caches.items()]),
+        ("evaluator_cache_misses_total", "counter", "Cache misses (commit files, verdicts, chunk summaries).",
+         [({"cache": name}, stats["misses"]) for name, stats in caches.items()]),
+        ("evaluator_cache_entries", "gauge", "Entries in each cache.",
+         [({"cache": name}, stats["entries"]) for name, stats in caches.items()]),
+        ("evaluator_prescreen_total", "counter", "Evaluations seen by the pre-filter, by decision.",
+         [({"decision": "skipped_llm"}, screened["llm_calls_saved"]),
+          ({"decision": "sent_to_llm"}, screened["sent_to_llm"])]),
+        ("evaluator_github_quota_remaining", "gauge", "GitHub quota left per token (hashed id), all workers.",
+         [({"token": q["token"]}, q["remaining"]) for q in quota]),
+        ("evaluator_github_quota_limit", "gauge", "GitHub quota per hour per token (hashed id).",
+         [({"token": q["token"]}, q["limit"]) for q in quota]),
+    ]
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,157 @@
+"""
+Pre-screening of an evaluation before the LLM call.
+
+A diff of a few lines cannot implement a challenge: `prescreen` returns a 0
+result for it, and None for everything else, which goes to the LLM as before.
+
+`screen` also reports whether the changed files match the technologies named in
+the description and how close the code is to it (TF-IDF). These signals do not
+reject anything: French descriptions and English code are rarely similar, so a
+mismatch alone is not enough to give 0. bench_prescreen.py measures them.
+"""
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+# PRESCREEN=1 active le pré-filtre (désactivé par défaut tant qu'il n'est pas calibré)
+PRESCREEN = os.getenv("PRESCREEN", "0") != "0"
+# En dessous de ce nombre de lignes modifiées (ajouts + suppressions), la note est 0
+PRESCREEN_MIN_LINES = int(os.getenv("PRESCREEN_MIN_LINES", "10"))
+
+_JS = {".js", ".jsx", ".ts", ".tsx", ".vue"}
+
+# Technologies citées dans une description -> extensions attendues dans les diffs. Seulement des
+# mots sans autre sens : "vue" (une vue), "java", "ios", "swift", "rails" ou "shell" se lisent
+# dans du texte libre, d'où "vue.js" / "vuejs", "node.js" / "nodejs"
+TECH_EXTENSIONS = {
+    "react": _JS, "react.js": _JS, "reactjs": _JS, "javascript": _JS, "js": _JS,
+    "node.js": _JS, "nodejs": _JS, "next.js": _JS, "nextjs": _JS,
+    "typescript": {".ts", ".tsx"}, "vue.js": {".vue", ".js", ".ts"}, "vuejs": {".vue", ".js", ".ts"},
+    "angular": {".ts", ".js"},
+    "python": {".py"}, "django": {".py"}, "flask": {".py"},
+    "kotlin": {".kt", ".java"}, "android": {".java", ".kt"},
+    "rust": {".rs"}, "golang": {".go"}, "php": {".php"}, "laravel": {".php"},
+    "ruby": {".rb"}, "c#": {".cs"}, "csharp": {".cs"}, "unity": {".cs"},
+    "c++": {".cpp", ".c"}, "cpp": {".cpp", ".c"}, "solidity": {".sol"},
+    "html": {".html"}, "css": {".css", ".scss"}, "sql": {".sql"}, "bash": {".sh"},
+}
+
+# Fichiers qui accompagnent n'importe quel projet : ils ne contredisent aucune technologie
+NEUTRAL_EXTENSIONS = {".html", ".css", ".scss", ".sql", ".sh", ".json", ".md"}
+
+STOPWORDS = {
+    # français
+    "une", "des", "les", "aux", "avec", "pour", "par", "sur", "dans", "qui", "que", "quoi", "est",
+    "sont", "faire", "fait", "cette", "ces", "son", "ses", "leur", "pas", "plus", "tout", "tous",
+    "application", "app", "projet", "utilisant", "utiliser", "doit", "peut", "etre", "avoir",
+    # anglais
+    "the", "and", "for", "with", "that", "this", "from", "are", "was", "not", "but", "all",
+    "make", "build", "using", "use", "should", "must", "can", "project",
+}
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def _strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase words without accents; identifiers are split (camelCase, snake_case)."""
+    text = _strip_accents(text)
+    words = re.findall(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+", text)
+    return [w.lower() for w in words if len(w) >= 3 and w.lower() not in STOPWORDS]
+
+
+def named_technologies(challenge_description: str) -> list[str]:
+    # "vue.js" reste un seul mot ; le point d'une fin de phrase ("en react.") est ignoré
+    words = re.findall(r"[\w#+]+(?:\.\w+)*", _strip_accents(challenge_description).lower())
+    return sorted({w for w in words if w in TECH_EXTENSIONS})
+
+
+def _diff_documents(commit_data: list[dict]) -> list[Counter]:
+    """One bag of words per changed file (name + added lines), plus one for the commit messages."""
+    documents = [Counter(tokenize(" ".join(c["message"] for c in commit_data)))]
+    for commit in commit_data:
+        for file in commit["files"]:
+            added = "\n".join(line[1:] for line in (file.get("patch") or "").splitlines() if line.startswith("+"))
+            documents.append(Counter(tokenize(file["filename"] + "\n" + added)))
+    return documents
+
+
+def tfidf_similarity(challenge_description: str, commit_data: list[dict]) -> float:
+    """
+    Cosine similarity between the description and the diffs, TF-IDF weighted.
+
+    The IDF is computed over the changed files, so words found in every file
+    (`import`, `const`, ...) weigh little and a word of the description found in
+    a few files weighs a lot.
+    """
+    documents = _diff_documents(commit_data)
+    n = len(documents)
+    df = Counter(term for doc in documents for term in doc)
+
+    def idf(term: str) -> float:
+        return math.log((1 + n) / (1 + df[term])) + 1
+
+    diff_tf = Counter()
+    for doc in documents:
+        diff_tf.update(doc)
+    diff_vector = {t: (1 + math.log(tf)) * idf(t) for t, tf in diff_tf.items()}
+    query_vector = {t: (1 + math.log(tf)) * idf(t) for t, tf in Counter(tokenize(challenge_description)).items()}
+
+    dot = sum(w * diff_vector.get(t, 0.0) for t, w in query_vector.items())
+    norm = math.sqrt(sum(w * w for w in query_vector.values())) * math.sqrt(sum(w * w for w in diff_vector.values()))
+    return dot / norm if norm else 0.0
+
+
+def screen(challenge_description: str, commit_data: list[dict], stats: dict) -> dict:
+    """The signals used by `prescreen` (also useful to debug a decision)."""
+    technologies = named_technologies(challenge_description)
+    expected = set().union(*(TECH_EXTENSIONS[t] for t in technologies)) if technologies else set()
+    extensions = set(stats["file_types"])
+    return {
+        "changed_lines": stats["total_additions"] + stats["total_deletions"],
+        "technologies": technologies,
+        "extension_match": not expected or bool(extensions & expected) or extensions <= NEUTRAL_EXTENSIONS,
+        "similarity": tfidf_similarity(challenge_description, commit_data),
+    }
+
+
+def prescreen(challenge_description: str, commit_data: list[dict], stats: dict) -> dict:
+    """A 0 result when the diff is too small to implement the challenge, otherwise None."""
+    changed_lines = stats["total_additions"] + stats["total_deletions"]
+
+    reason = None
+    if changed_lines < PRESCREEN_MIN_LINES:
+        reason = f"Diff trop petit ({changed_lines} lignes modifiées) pour réaliser le challenge."
+
+    with _counters_lock:
+        _counters["screened"] += 1
+        if reason:
+            _counters["rejected"] += 1
+    if reason is None:
+        return None
+
+    return {
+        "summary": "Évaluation préliminaire, sans appel au LLM.",
+        "evaluation": reason,
+        "score": 0,
+        "stats": stats,
+        "cached": False,
+        "prescreened": True,
+    }
+
+
+def prescreen_stats() -> dict:
+    """Evaluations screened in this process, and how many LLM calls were saved."""
+    with _counters_lock:
+        return {
+            "screened": _counters["screened"],
+            "llm_calls_saved": _counters["rejected"],
+            "sent_to_llm": _counters["screened"] - _counters["rejected"],
+        }
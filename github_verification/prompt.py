@@ -0,0 +1,260 @@
+import os
+import threading
+
+PROMPT_HEADER = """Tu es un assistant expert en revue de code. Ton rôle est d'évaluer si un développeur a respecté un objectif annoncé dans un challenge de codage.
+
+*** OBJECTIF DU CHALLENGE ***
+🎯 L'objectif du challenge est le suivant:
+{challenge_description}
+
+*** CODE IMPLEMENTE ***
+📂 Voici les commits et les changements associés (fichiers de code uniquement) :
+"""
+
+PROMPT_INSTRUCTIONS = """
+---
+
+Tu connais maintenant l'objectif du challenge, c'est-à-dire ce qui est attendu du développeur. Et tu connais également le code implémenté, pour savoir si le challenge est réussi ou non, tu vas suivre les étapes suivantes:
+
+🧠 Étape 1 : Donne un **résumé technique clair** de ce qui a été fait dans le code (ce que le développeur a réellement produit).
+
+🧪 Étape 2 : Vérifie **si le travail accompli correspond exactement à l'objectif du challenge**.
+- Liste les mots-clés et concepts spécifiques de l'objectif du challenge
+- Liste les mots-clés et concepts spécifiques du résumé technique
+- Vérifie s'il y a une correspondance directe entre ces deux ensembles de concepts
+- Identifie clairement tout écart ou divergence entre le résumé technique et l'objectif
+
+ATTENTION CRITIQUE: Tu dois faire une comparaison terme à terme entre l'objectif du challenge et le résumé technique. Pour qu'un challenge soit considéré comme respecté, le domaine technique et la fonctionnalité principale DOIVENT correspondre exactement.
+
+Exemples d'incompatibilité:
+- Si l'objectif mentionne "page web météo" et le code concerne "modèle de pruning", alors le challenge n'est PAS respecté.
+- Si l'objectif mentionne "API REST" et le code implémente "interface graphique", alors le challenge n'est PAS respecté.
+- Si l'objectif mentionne "base de données SQL" et le code implémente "stockage NoSQL", alors le challenge n'est PAS respecté.
+
+📊 Étape 3 : Donne une **note sur 10** uniquement si le code correspond à l'objectif. Sinon, donne une note de 0 et explique clairement pourquoi.
+
+Format obligatoire de ta réponse :
+
+- Résumé technique :
+- Évaluation :
+  - Mots-clés de l'objectif: [liste]
+  - Mots-clés du résumé: [liste]
+  - Correspondance: [OUI/NON avec explication]
+- NOTE: X
+"""
+
+# Taille de contexte utilisable pour le prompt, par modèle (tokens, réponse déduite)
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "32768"))
+# Les modèles Ollama tournent avec num_ctx = OLLAMA_NUM_CTX ; qwen3 raisonne
+# longuement avant de répondre, d'où la grosse réserve pour la réponse.
+OLLAMA_RESPONSE_TOKENS = 4096
+PROMPT_TOKEN_BUDGETS = {
+    "openai:gpt-4o": 128000 - 2000,
+}
+DEFAULT_PROMPT_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "28000"))
+# Tokens gardés pour le résumé des fichiers omis
+SUMMARY_RESERVE_TOKENS = 300
+
+# Lockfiles et code généré : jamais envoyés au LLM
+GENERATED_FILENAMES = {
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock", "Pipfile.lock",
+    "Cargo.lock", "composer.lock", "Gemfile.lock", "go.sum", "bun.lockb"
+}
+GENERATED_SUFFIXES = (
+    ".min.js", ".min.css", ".map", ".lock", ".pb.go", "_pb2.py", ".generated.ts", ".generated.js"
+)
+GENERATED_DIRS = {"node_modules", "dist", "build", "vendor", "__generated__", ".next", "out"}
+
+
+def format_commit_header(commit: dict) -> str:
+    return f"\n---\n🔐 Commit {commit['sha'][:7]} - {commit['date']}\n📝 Message: {commit['message']}\n"
+
+
+def iter_file(file: dict):
+    """Yield the file header, then its diff, without copying the patch."""
+    yield f"\n📄 Fichier: {file['filename']} (+{file['additions']} / -{file['deletions']})\n"
+    if file["patch"]:
+        yield "diff\n"
+        yield file["patch"]
+        yield "\n\n"
+
+
+def format_file(file: dict) -> str:
+    return "".join(iter_file(file))
+
+
+def is_generated_file(filename: str) -> bool:
+    parts = filename.split("/")
+    name = parts[-1]
+    return (
+        name in GENERATED_FILENAMES
+        or name.endswith(GENERATED_SUFFIXES)
+        or any(part in GENERATED_DIRS for part in parts[:-1])
+    )
+
+
+# --- Comptage des tokens ---
+
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+def _estimate_tokens(text: str) -> int:
+    # Estimation prudente quand le tokenizer du modèle n'est pas disponible :
+    # le code et le français tournent autour de 3 à 4 caractères par token.
+    return len(text) // 3 + 1
+
+
+def _load_counter(model: str):
+    if model and model.startswith("openai:"):
+        try:
+            import tiktoken
+
+            encoding = tiktoken.encoding_for_model(model.split(":", 1)[1])
+            return lambda text: len(encoding.encode(text, disallowed_special=()))
+        except Exception:
+            # tiktoken absent, modèle inconnu ou encodage non téléchargeable
+            pass
+    return _estimate_tokens
+
+
+def get_token_counter(model: str = None):
+    """Return a `text -> token count` function for `model` (cached)."""
+    with _counters_lock:
+        counter = _counters.get(model)
+        if counter is None:
+            counter = _counters[model] = _load_counter(model)
+        return counter
+
+
+def count_tokens(text: str, model: str = None) -> int:
+    return get_token_counter(model)(text)
+
+
+def prompt_token_budget(model: str = None) -> int:
+    if model in PROMPT_TOKEN_BUDGETS:
+        return PROMPT_TOKEN_BUDGETS[model]
+    if model and model.startswith("ollama:"):
+        return OLLAMA_NUM_CTX - OLLAMA_RESPONSE_TOKENS
+    return DEFAULT_PROMPT_TOKENS
+
+
+# --- Sélection des diffs ---
+
+def file_tokens(file: dict, count) -> int:
+    return sum(count(chunk) for chunk in iter_file(file))
+
+
+def commit_tokens(commit: dict, count) -> int:
+    """Token cost of a commit with all its (non generated) files."""
+    return count(format_commit_header(commit)) + sum(
+        file_tokens(file, count) for file in commit["files"] if not is_generated_file(file["filename"])
+    )
+
+
+def select_files(commits: list[dict], budget: int, model: str = None) -> tuple[set, list[dict]]:
+    """
+    Pick the files whose diffs fit in `budget` tokens, largest code changes first.
+
+    Returns `(selected, omitted)`: the `(commit index, file index)` pairs to
+    render, and the files left out (generated files and lockfiles are always left out).
+    A commit header is only paid for once one of its files is selected.
+    """
+    count = get_token_counter(model)
+    candidates = []
+    omitted = []
+    for ci, commit in enumerate(commits):
+        for fi, file in enumerate(commit["files"]):
+            if is_generated_file(file["filename"]):
+                omitted.append(dict(file, generated=True))
+            else:
+                candidates.append((file["additions"] + file["deletions"], ci, fi))
+    candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+
+    selected = set()
+    headers_paid = set()
+    remaining = budget
+    for _, ci, fi in candidates:
+        file = commits[ci]["files"][fi]
+        cost = file_tokens(file, count)
+        if ci not in headers_paid:
+            cost += count(format_commit_header(commits[ci]))
+        if cost <= remaining:
+            selected.add((ci, fi))
+            headers_paid.add(ci)
+            remaining -= cost
+        else:
+            omitted.append(file)
+    return selected, omitted
+
+
+def format_omitted_summary(omitted: list[dict]) -> str:
+    """Short recap of the files left out of the prompt."""
+    if not omitted:
+        return ""
+    generated = [f for f in omitted if f.get("generated")]
+    skipped = [f for f in omitted if not f.get("generated")]
+    lines = ["\n---\nℹ️ Fichiers non inclus dans ce prompt :"]
+    if skipped:
+        extensions = {}
+        for f in skipped:
+            ext = os.path.splitext(f["filename"])[1].lower() or "(sans extension)"
+            extensions[ext] = extensions.get(ext, 0) + 1
+        by_ext = ", ".join(f"{ext} ({n})" for ext, n in sorted(extensions.items(), key=lambda e: -e[1]))
+        additions = sum(f["additions"] for f in skipped)
+        deletions = sum(f["deletions"] for f in skipped)
+        lines.append(f"- {len(skipped)} fichier(s) de code plus petits, omis faute de place (+{additions} / -{deletions}) : {by_ext}")
+    if generated:
+        lines.append(f"- {len(generated)} fichier(s) générés ou lockfiles ignorés")
+    return "\n".join(lines) + "\n"
+
+
+def iter_budgeted(header: str, commits: list[dict], footer: str, model: str = None):
+    """
+    Yield `header`, the commits and `footer`, chunk by chunk.
+
+    Without `model` every diff is included. With a model id, `header` and
+    `footer` are always kept and the diffs are filled in by relevance up to the
+    model's token budget; the rest is summarized before `footer`.
+    """
+    yield header
+
+    selected, omitted = None, []
+    if model is not None:
+        count = get_token_counter(model)
+        budget = prompt_token_budget(model) - count(header) - count(footer) - SUMMARY_RESERVE_TOKENS
+        selected, omitted = select_files(commits, max(budget, 0), model)
+
+    for ci, commit in enumerate(commits):
+        files = commit["files"] if selected is None else [
+            file for fi, file in enumerate(commit["files"]) if (ci, fi) in selected
+        ]
+        if files:
+            yield format_commit_header(commit)
+            for file in files:
+                yield from iter_file(file)
+
+    if omitted:
+        yield format_omitted_summary(omitted)
+    yield footer
+
+
+def iter_prompt(challenge_description: str, commits: list[dict], start_date: str, end_date: str,
+                stats: dict, model: str = None):
+    """
+    Yield the evaluation prompt chunk by chunk (header, commit headers, file
+    headers, diff bodies, instructions).
+
+    Without `model` every diff is included. With a model id (see
+    `verdict_cache.llm_identity`), the challenge description and the
+    instructions are always kept and the diffs are filled in by relevance up
+    to the model's token budget; the rest is summarized.
+    """
+    header = PROMPT_HEADER.format(challenge_description=challenge_description)
+    yield from iter_budgeted(header, commits, PROMPT_INSTRUCTIONS, model)
+
+
+def format_prompt(challenge_description: str, commits: list[dict], start_date: str, end_date: str,
+                  stats: dict, model: str = None) -> str:
+    """Build the evaluation prompt (see `iter_prompt`), joined once."""
+    return "".join(iter_prompt(challenge_description, commits, start_date, end_date, stats, model=model))
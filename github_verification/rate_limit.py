@@ -0,0 +1,248 @@
+"""
+GitHub REST quota shared by every worker process.
+
+The governor keeps, per token, the quota last reported by GitHub
+(`X-RateLimit-*` headers) in a SQLite file, and every request takes one unit
+from it before going out, so all gunicorn workers see the same remaining quota.
+Each request goes out with the token that has the most quota left. When quota
+runs low, requests are spread until the reset. The last part of each token's
+quota is kept for higher priorities. When every token is empty, requests wait
+for the reset instead of failing with a 403.
+"""
+import asyncio
+import contextvars
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from commit_cache import CACHE_DIR
+
+PRIORITIES = ("high", "normal", "low")
+# Part du quota de chaque token gardée pour les priorités plus hautes
+QUOTA_RESERVE = {"high": 0.0, "normal": 0.05, "low": 0.25}
+# En dessous de cette part de quota restante, les requêtes sont étalées jusqu'au reset
+GITHUB_PACE_BELOW = float(os.getenv("GITHUB_PACE_BELOW", "0.2"))
+# Attente max d'un reset de quota avant d'abandonner (secondes)
+GITHUB_MAX_QUOTA_WAIT = float(os.getenv("GITHUB_MAX_QUOTA_WAIT", "120"))
+# Quota supposé d'un token dont GitHub n'a encore rien dit (authentifié / anonyme)
+DEFAULT_RATE_LIMIT = 5000
+ANONYMOUS_RATE_LIMIT = 60
+# X-RateLimit-Reset est à la seconde près et les horloges diffèrent : marge avant de croire au reset
+RESET_MARGIN = 1.0
+
+# Priorité et compteurs de l'évaluation en cours (propagés aux tâches qu'elle crée)
+current_priority = contextvars.ContextVar("github_priority", default="normal")
+current_usage = contextvars.ContextVar("github_quota_usage", default=None)
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+def token_id(token: str) -> str:
+    """Tokens are never written to disk, only a hash of them."""
+    return hashlib.sha256((token or "").encode()).hexdigest()[:16]
+
+
+class QuotaUsage:
+    """GitHub quota consumed by one evaluation."""
+
+    def __init__(self):
+        self.requests = 0
+        self.rate_limited = 0
+        self.wait_seconds = 0.0
+        self.remaining = None
+        self.by_token = Counter()
+
+    def record(self, token: str, remaining: int = None) -> None:
+        self.requests += 1
+        self.by_token[token_id(token)] += 1
+        if remaining is not None:
+            self.remaining = remaining if self.remaining is None else min(self.remaining, remaining)
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "remaining": self.remaining,
+            "tokens": len(self.by_token),
+        }
+
+
+def _header_int(headers, name: str):
+    value = headers.get(name)
+    return int(value) if value is not None and value.isdigit() else None
+
+
+class RateLimitGovernor:
+    def __init__(self, path: str = None, pace_below: float = GITHUB_PACE_BELOW,
+                 max_wait: float = GITHUB_MAX_QUOTA_WAIT):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "rate_limit.sqlite")
+        self.path = path
+        self.pace_below = pace_below
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS quota (
+                token_id TEXT PRIMARY KEY,
+                quota_limit INTEGER NOT NULL,
+                remaining INTEGER NOT NULL,
+                reset_at REAL NOT NULL,
+                next_at REAL NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )"""
+        )
+
+    def _reserve(self, tokens: list[str], priority: str) -> tuple:
+        """
+        Take one unit of quota: `(token, delay, None)` with the delay imposed by
+        the pacing, or `(None, 0, reset_at)` when no token has quota for this priority.
+        """
+        now = time.time()
+        ids = {token_id(t): t for t in tokens}
+        with self._lock:
+            # BEGIN IMMEDIATE : lecture + décrément atomiques entre processus
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = {row[0]: list(row[1:]) for row in self._conn.execute(
+                    f"SELECT token_id, quota_limit, remaining, reset_at, next_at FROM quota "
+                    f"WHERE token_id IN ({', '.join('?' * len(ids))})", list(ids)
+                )}
+                best, best_available = None, 0
+                for tid, token in ids.items():
+                    if tid not in rows:
+                        # Quota pas encore annoncé par le serveur : rien à décompter pour l'instant
+                        limit = DEFAULT_RATE_LIMIT if token else ANONYMOUS_RATE_LIMIT
+                        if limit > best_available:
+                            best, best_available = tid, limit
+                        continue
+                    limit, remaining, reset_at, _ = rows[tid]
+                    if reset_at + RESET_MARGIN <= now:
+                        # Nouvelle fenêtre : la prochaine réponse donnera le vrai reset
+                        rows[tid][1] = remaining = limit
+                        rows[tid][2] = reset_at = now + 3600
+                    available = remaining - QUOTA_RESERVE[priority] * limit
+                    if available > best_available:
+                        best, best_available = tid, available
+
+                if best is None:
+                    self._conn.execute("COMMIT")
+                    return None, 0.0, min(row[2] for row in rows.values()) + RESET_MARGIN
+                if best not in rows:
+                    self._conn.execute("COMMIT")
+                    return ids[best], 0.0, None
+
+                limit, remaining, reset_at, next_at = rows[best]
+                delay = 0.0
+                if remaining < self.pace_below * limit:
+                    # Quota bas : une requête toutes les (temps avant reset / quota restant) secondes
+                    start = max(now, next_at)
+                    next_at = start + (reset_at - now) / remaining
+                    delay = start - now
+                self._conn.execute(
+                    """INSERT INTO quota VALUES (?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (token_id) DO UPDATE SET quota_limit = excluded.quota_limit,
+                       remaining = excluded.remaining, reset_at = excluded.reset_at,
+                       next_at = excluded.next_at, updated_at = excluded.updated_at""",
+                    (best, limit, remaining - 1, reset_at, next_at, now),
+                )
+                self._conn.execute("COMMIT")
+                return ids[best], delay, None
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    async def acquire(self, tokens: list[str], priority: str = None) -> str:
+        """The token to use for the next request, once the quota allows it."""
+        priority = priority or current_priority.get()
+        usage = current_usage.get()
+        deadline = time.time() + self.max_wait
+        waited_at = time.monotonic()
+        while True:
+            token, delay, reset_at = self._reserve(tokens, priority)
+            if token is not None:
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if usage is not None:
+                    usage.wait_seconds += time.monotonic() - waited_at
+                return token
+            if reset_at > deadline:
+                reset = datetime.fromtimestamp(reset_at, timezone.utc).isoformat()
+                raise RateLimitExceeded(f"GitHub quota exhausted for every token until {reset}")
+            # Un autre worker peut voir le reset avant nous : on revérifie régulièrement
+            await asyncio.sleep(min(max(reset_at - time.time(), 0.05), 5.0))
+
+    def update(self, token: str, headers) -> int:
+        """Record the quota reported by a response; return the remaining quota (None without headers)."""
+        remaining = _header_int(headers, "x-ratelimit-remaining")
+        limit = _header_int(headers, "x-ratelimit-limit")
+        reset_at = _header_int(headers, "x-ratelimit-reset")
+        if remaining is None or limit is None or reset_at is None:
+            return None
+        with self._lock:
+            # Même fenêtre : les requêtes déjà réservées mais pas encore revenues restent décomptées
+            self._conn.execute(
+                """INSERT INTO quota VALUES (?, ?, ?, ?, 0, ?)
+                   ON CONFLICT (token_id) DO UPDATE SET quota_limit = excluded.quota_limit,
+                   remaining = CASE WHEN abs(quota.reset_at - excluded.reset_at) < 1
+                                    THEN min(quota.remaining, excluded.remaining) ELSE excluded.remaining END,
+                   reset_at = excluded.reset_at, updated_at = excluded.updated_at""",
+                (token_id(token), limit, remaining, reset_at, time.time()),
+            )
+        return remaining
+
+    def exhausted(self, token: str, headers) -> None:
+        """The token was rate limited (403/429): no request with it before the reset or Retry-After."""
+        retry_after = _header_int(headers, "retry-after")
+        reset_at = _header_int(headers, "x-ratelimit-reset")
+        until = time.time() + retry_after if retry_after is not None else reset_at or time.time() + 60
+        limit = _header_int(headers, "x-ratelimit-limit") or DEFAULT_RATE_LIMIT
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO quota VALUES (?, ?, 0, ?, 0, ?)
+                   ON CONFLICT (token_id) DO UPDATE SET remaining = 0, reset_at = excluded.reset_at,
+                   updated_at = excluded.updated_at""",
+                (token_id(token), limit, until, time.time()),
+            )
+        usage = current_usage.get()
+        if usage is not None:
+            usage.rate_limited += 1
+
+    def stats(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT token_id, quota_limit, remaining, reset_at FROM quota ORDER BY token_id"
+            ).fetchall()
+        return [{"token": r[0], "limit": r[1], "remaining": r[2], "reset_at": r[3]} for r in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def is_rate_limited(response) -> bool:
+    """Primary (remaining = 0) or secondary (Retry-After) GitHub rate limit."""
+    if response.status_code not in (403, 429):
+        return False
+    return response.headers.get("x-ratelimit-remaining") == "0" or "retry-after" in response.headers
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> RateLimitGovernor:
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = RateLimitGovernor()
+        return _governor
@@ -0,0 +1,206 @@
+"""
+Record / replay of the evaluator's external calls (GitHub REST API and LLM).
+
+A cassette is a JSON file holding the GitHub responses, keyed by method, path
+and query string, and the LLM answers, keyed by prompt fingerprint. Recording
+wraps the real transports. Replaying serves everything from the cassette and
+raises `CassetteMiss` for any call it does not know, so a replayed evaluation
+never touches the network.
+
+    cassette = Cassette.load("demo.json")
+    use_cassette(cassette, "replay")
+    evaluate_challenge(..., llm_function=get_backend("replay"))
+"""
+import asyncio
+import json
+import threading
+from urllib.parse import urlencode
+
+from github_pool import get_pool
+from llm_backends import LLMBackend, get_backend, get_registry
+from verdict_cache import prompt_fingerprint
+
+CASSETTE_VERSION = 1
+# Seuls ces en-têtes sont gardés : les X-RateLimit-* décrivent le quota du moment de l'enregistrement
+KEPT_HEADERS = ("content-type", "link")
+
+
+class CassetteMiss(Exception):
+    pass
+
+
+def request_key(method: str, url) -> str:
+    """`GET /repos/o/r/commits?page=2&per_page=100`: the host is ignored, the query is sorted."""
+    query = urlencode(sorted(url.params.multi_items()))
+    return f"{method} {url.path}" + (f"?{query}" if query else "")
+
+
+class Cassette:
+    def __init__(self, path: str = None, data: dict = None):
+        data = data or {}
+        if data.get("version", CASSETTE_VERSION) != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version: {data['version']}")
+        self.path = path
+        self.github = data.get("github", {})
+        self.llm = data.get("llm", {})
+        self.model_id = data.get("model_id")
+        # Évaluations enregistrées (paramètres), rejouées par benchmarks/bench_e2e.py
+        self.evaluations = data.get("evaluations", [])
+        self.github_requests = 0
+        self.llm_calls = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with open(path) as f:
+            return cls(path, json.load(f))
+
+    def save(self, path: str = None) -> None:
+        path = path or self.path
+        with self._lock:
+            data = {
+                "version": CASSETTE_VERSION,
+                "model_id": self.model_id,
+                "evaluations": self.evaluations,
+                "github": self.github,
+                "llm": self.llm,
+            }
+        with open(path, "w") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.github_requests = 0
+            self.llm_calls = 0
+
+    def put_response(self, key: str, status: int, headers: dict, body: str) -> None:
+        with self._lock:
+            self.github[key] = {"status": status, "headers": headers, "body": body}
+
+    def response(self, key: str) -> dict:
+        with self._lock:
+            self.github_requests += 1
+            entry = self.github.get(key)
+        if entry is None:
+            raise CassetteMiss(f"GitHub request not in cassette: {key}")
+        return entry
+
+    def put_answer(self, fingerprint: str, answer: str) -> None:
+        with self._lock:
+            self.llm[fingerprint] = answer
+
+    def answer(self, fingerprint: str) -> str:
+        with self._lock:
+            self.llm_calls += 1
+            answer = self.llm.get(fingerprint)
+        if answer is None:
+            raise CassetteMiss(f"LLM prompt not in cassette: {fingerprint[:12]}")
+        return answer
+
+    def add_evaluation(self, **params) -> None:
+        with self._lock:
+            if params not in self.evaluations:
+                self.evaluations.append(params)
+
+
+def _transport_classes():
+    import httpx
+
+    class RecordingTransport(httpx.AsyncBaseTransport):
+        """Forward to the real transport and store each response in the cassette."""
+
+        def __init__(self, cassette: Cassette):
+            self.cassette = cassette
+            self.inner = httpx.AsyncHTTPTransport()
+
+        async def handle_async_request(self, request):
+            response = await self.inner.handle_async_request(request)
+            raw = await response.aread()
+            await response.aclose()
+            # Décodé (gzip...) via une réponse httpx, puis servi sans Content-Encoding
+            body = httpx.Response(response.status_code, headers=response.headers, content=raw).text
+            headers = {k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS}
+            self.cassette.put_response(request_key(request.method, request.url), response.status_code, headers, body)
+            return httpx.Response(response.status_code, headers=headers, content=body.encode(), request=request)
+
+        async def aclose(self) -> None:
+            await self.inner.aclose()
+
+    class ReplayTransport(httpx.AsyncBaseTransport):
+        """Serve the responses from the cassette; `latency` simulates the network."""
+
+        def __init__(self, cassette: Cassette, latency: float = 0.0):
+            self.cassette = cassette
+            self.latency = latency
+
+        async def handle_async_request(self, request):
+            entry = self.cassette.response(request_key(request.method, request.url))
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return httpx.Response(entry["status"], headers=entry["headers"], content=entry["body"].encode(),
+                                  request=request)
+
+    return RecordingTransport, ReplayTransport
+
+
+class RecordingBackend(LLMBackend):
+    """Ask `inner` and store each answer in the cassette."""
+
+    kind = "record"
+
+    def __init__(self, name: str, cassette: Cassette, inner: LLMBackend):
+        super().__init__(name, inner.model)
+        self.cassette = cassette
+        self.inner = inner
+        cassette.model_id = inner.model_id
+
+    @property
+    def model_id(self) -> str:
+        return self.inner.model_id
+
+    async def complete(self, prompt: str) -> str:
+        answer = await self.inner.complete(prompt)
+        self.cassette.put_answer(prompt_fingerprint(prompt, self.model_id), answer)
+        return answer
+
+
+class ReplayBackend(LLMBackend):
+    """Answer from the cassette, as the recorded model (same prompt budget, same fingerprints)."""
+
+    kind = "replay"
+
+    def __init__(self, name: str, cassette: Cassette, latency: float = 0.0):
+        super().__init__(name, cassette.model_id, max_concurrency=64)
+        self.cassette = cassette
+        self.latency = latency
+
+    @property
+    def model_id(self) -> str:
+        return self.cassette.model_id
+
+    async def _complete(self, prompt: str) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.cassette.answer(prompt_fingerprint(prompt, self.model_id))
+
+
+def use_cassette(cassette: Cassette, mode: str, llm_backend: str = None,
+                 github_latency: float = 0.0, llm_latency: float = 0.0) -> LLMBackend:
+    """
+    Route the GitHub client of this process through the cassette, and register
+    the "record" (wrapping `llm_backend`) or "replay" LLM backend. Returns it.
+    """
+    RecordingTransport, ReplayTransport = _transport_classes()
+    pool = get_pool()
+    if mode == "record":
+        pool.transport_factory = lambda: RecordingTransport(cassette)
+        backend = RecordingBackend("record", cassette, get_backend(llm_backend))
+    elif mode == "replay":
+        pool.transport_factory = lambda: ReplayTransport(cassette, github_latency)
+        backend = ReplayBackend("replay", cassette, llm_latency)
+    else:
+        raise ValueError(f"Unknown cassette mode: {mode}")
+    # Les clients déjà créés gardent l'ancien transport
+    pool.reset()
+    get_registry().register(backend)
+    return backend
@@ -1,104 +1,497 @@
+import argparse
+import functools
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import cv2
 import mediapipe as mp
 import numpy as np
 
 # Initialize MediaPipe Pose
 mp_pose = mp.solutions.pose
-pose = mp_pose.Pose(static_image_mode=False, min_detection_confidence=0.5, min_tracking_confidence=0.5)
 mp_drawing = mp.solutions.drawing_utils
 
+PUSHUP_THRESHOLD_DOWN = 90  # Elbow angle for push-up down state
+PUSHUP_THRESHOLD_UP = 160   # Elbow angle for push-up up state
+SQUAT_THRESHOLD_DOWN = 100  # Knee angle for squat down state
+SQUAT_THRESHOLD_UP = 160    # Knee angle for squat up state
+
+# Échantillonnage : une image analysée sur SPORT_STRIDE, toutes près des seuils "down"
+# si SPORT_ADAPTIVE, et images réduites à SPORT_MAX_WIDTH pixels de large (0 = taille d'origine).
+# Par défaut toutes les images sont analysées : changer les défauts demande de mesurer la
+# précision sur un jeu de vidéos étiquetées (benchmarks/bench_sport_sampling.py --labels).
+SPORT_STRIDE = int(os.getenv("SPORT_STRIDE", "1"))
+SPORT_ADAPTIVE = os.getenv("SPORT_ADAPTIVE", "0") != "0"
+SPORT_MAX_WIDTH = int(os.getenv("SPORT_MAX_WIDTH", "0"))
+ADAPTIVE_MARGIN = 25  # Degrees above a "down" threshold where every frame is analysed
+
+# Processus de comptage (un Pose chacun) et recouvrement entre segments d'une longue vidéo
+SPORT_WORKERS = int(os.getenv("SPORT_WORKERS", str(os.cpu_count() or 1)))
+SEGMENT_OVERLAP_SECONDS = float(os.getenv("SEGMENT_OVERLAP_SECONDS", "3"))
+
+# Cache des landmarks (float16, mappé en mémoire) à côté de chaque vidéo, ou dans ce dossier
+SPORT_LANDMARK_CACHE = os.getenv("SPORT_LANDMARK_CACHE", "1") != "0"
+SPORT_LANDMARK_CACHE_DIR = os.getenv("SPORT_LANDMARK_CACHE_DIR", "")
+
+def new_pose():
+    return mp_pose.Pose(static_image_mode=False, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+# Articulations suivies : (point, sommet de l'angle, point), indices MediaPipe
+JOINTS = {
+    "elbow": (mp_pose.PoseLandmark.LEFT_SHOULDER.value, mp_pose.PoseLandmark.LEFT_ELBOW.value,
+              mp_pose.PoseLandmark.LEFT_WRIST.value),
+    "knee": (mp_pose.PoseLandmark.LEFT_HIP.value, mp_pose.PoseLandmark.LEFT_KNEE.value,
+             mp_pose.PoseLandmark.LEFT_ANKLE.value),
+}
+# Exercice -> (articulation, seuil "down", seuil "up", clé des instants dans le résultat)
+EXERCISES = {
+    "pushups": ("elbow", PUSHUP_THRESHOLD_DOWN, PUSHUP_THRESHOLD_UP, "pushup_times"),
+    "squats": ("knee", SQUAT_THRESHOLD_DOWN, SQUAT_THRESHOLD_UP, "squat_times"),
+}
+N_LANDMARKS = 33
+
+def angles_between(a, b, c):
+    """Angle in degrees at `b` for arrays of 2D points `(..., 2)` (all frames at once)."""
+    radians = np.arctan2(c[..., 1] - b[..., 1], c[..., 0] - b[..., 0]) - np.arctan2(a[..., 1] - b[..., 1], a[..., 0] - b[..., 0])
+    angle = np.abs(np.degrees(radians))
+    return np.where(angle > 180.0, 360.0 - angle, angle)
+
 # Function to calculate angle between three points
 def calculate_angle(a, b, c):
-    a = np.array(a)  # First point
-    b = np.array(b)  # Mid point
-    c = np.array(c)  # End point
-    radians = np.arctan2(c[1] - b[1], c[0] - b[0]) - np.arctan2(a[1] - b[1], a[0] - b[0])
-    angle = np.abs(radians * 180.0 / np.pi)
-    if angle > 180.0:
-        angle = 360 - angle
-    return angle
+    return float(angles_between(np.asarray(a), np.asarray(b), np.asarray(c)))
 
-# Function to process video and count exercises
-def count_exercises(video_path):
+def joint_angles(landmarks):
+    """Angle of each joint of JOINTS for a `(frames, 33, 3)` array (NaN where no pose was found)."""
+    # Calcul en float32 : le cache est en float16 (seules les colonnes utiles sont lues)
+    return {joint: angles_between(*(landmarks[:, i, :2].astype(np.float32) for i in (a, b, c)))
+            for joint, (a, b, c) in JOINTS.items()}
+
+def count_reps(angles, threshold_down, threshold_up):
+    """
+    Positions in `angles` where a rep is completed: the angle goes above
+    `threshold_up` after having gone below `threshold_down` (starting "up").
+
+    Same state machine as a frame-by-frame loop: only the alternation of
+    "down" and "up" events matters, so it is read off the event sequence.
+    """
+    events = np.where(angles < threshold_down, -1, np.where(angles > threshold_up, 1, 0))
+    positions = np.flatnonzero(events)
+    events = events[positions]
+    # Un "up" qui suit un "down" termine une répétition (l'état initial est "up")
+    completed = (events[1:] == 1) & (events[:-1] == -1)
+    return positions[1:][completed]
+
+class LandmarkSeries:
+    """
+    Landmarks of the analysed frames of a video: `landmarks` `(n, 33, 3)`
+    (x, y, z normalized, NaN where no pose was found), the frame index and the
+    time (seconds) of each row, and the first frame whose reps are counted.
+    """
+
+    def __init__(self, landmarks, frames, times, count_from=0):
+        self.landmarks = landmarks
+        self.frames = frames
+        self.times = times
+        self.count_from = count_from
+
+    def __len__(self):
+        return len(self.frames)
+
+    def angles(self):
+        return joint_angles(self.landmarks)
+
+def count_series(series, timestamps=False, thresholds=None, angles=None):
+    """
+    Count the reps of a `LandmarkSeries` without running the pose model again.
+
+    thresholds: `{"pushups": (down, up), ...}` to override EXERCISES (offline re-counting)
+    angles: the joint angles of the series, when already computed
+    """
+    thresholds = thresholds or {}
+    angles = angles if angles is not None else series.angles()
+    result = {}
+    times = {}
+    for exercise, (joint, down, up, times_key) in EXERCISES.items():
+        down, up = thresholds.get(exercise, (down, up))
+        reps = count_reps(angles[joint], down, up)
+        # Répétitions terminées avant le segment (pendant le warm-up) : comptées par le segment précédent
+        reps = reps[series.frames[reps] >= series.count_from]
+        result[exercise] = len(reps)
+        times[times_key] = [round(float(t), 3) for t in series.times[reps]]
+    if timestamps:
+        result.update(times)
+    return result
+
+def extract_landmarks(video_path, headless=True, display=True, pose=None,
+                      start_frame=0, end_frame=None, warmup_frames=0,
+                      stride=SPORT_STRIDE, adaptive=SPORT_ADAPTIVE, max_width=SPORT_MAX_WIDTH):
+    """
+    Run the pose model over a video and return its `LandmarkSeries` (None if the
+    video cannot be opened). Arguments as for `count_exercises`.
+    """
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
-        print("Error: Could not open video.")
+        print(f"Error: Could not open video {video_path}.")
+        return None
+    frame_idx = max(start_frame - warmup_frames, 0)
+    if frame_idx:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+    display = display and not headless
+
+    # Tampons préalloués pour toutes les images de la plage, agrandis si le conteneur a sous-estimé
+    last_frame = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if end_frame is None else end_frame
+    capacity = max(last_frame - frame_idx, 1)
+    landmarks = np.full((capacity, N_LANDMARKS, 3), np.nan, dtype=np.float32)
+    frames = np.zeros(capacity, dtype=np.int64)
+    times = np.zeros(capacity, dtype=np.float64)
+    n = 0
+
+    # Le suivi ne doit pas passer d'une vidéo (ou d'un segment) à l'autre
+    own_pose = pose is None
+    if own_pose:
+        pose = new_pose()
+    else:
+        pose.reset()
+    next_frame = frame_idx  # prochaine image passée au modèle
+    # Compteurs affichés, tenus image par image (même automate que count_reps) ; le compte
+    # renvoyé est recalculé sur toute la série
+    is_down = dict.fromkeys(EXERCISES, False)
+    overlay = dict.fromkeys(EXERCISES, 0)
+    try:
+        while cap.isOpened() and (end_frame is None or frame_idx < end_frame):
+            if frame_idx < next_frame:
+                # Image sautée : décodée par grab() mais ni convertie ni analysée
+                if not cap.grab():
+                    break
+                frame_idx += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if n == capacity:
+                capacity *= 2
+                landmarks = np.concatenate([landmarks, np.full_like(landmarks, np.nan)])
+                frames = np.resize(frames, capacity)
+                times = np.resize(times, capacity)
+            frames[n] = frame_idx
+            times[n] = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+            frame_idx += 1
+            next_frame = frame_idx - 1 + max(stride, 1)
+
+            # Les landmarks sont normalisés : les angles ne dépendent pas de la taille de l'image
+            pose_input = frame
+            if max_width and frame.shape[1] > max_width:
+                height = round(frame.shape[0] * max_width / frame.shape[1])
+                pose_input = cv2.resize(frame, (max_width, height), interpolation=cv2.INTER_AREA)
+
+            # Convert frame to RGB for MediaPipe
+            frame_rgb = cv2.cvtColor(pose_input, cv2.COLOR_BGR2RGB)
+            results = pose.process(frame_rgb)
+
+            if results.pose_landmarks:
+                landmarks[n] = [(lm.x, lm.y, lm.z) for lm in results.pose_landmarks.landmark]
+                if adaptive or not headless:
+                    angles = joint_angles(landmarks[n:n + 1])
+                if adaptive:
+                    if any(angles[joint][0] < down + ADAPTIVE_MARGIN for joint, down, _, _ in EXERCISES.values()):
+                        next_frame = frame_idx
+
+                # Draw landmarks and counts on frame
+                if not headless:
+                    for exercise, (joint, down, up, _) in EXERCISES.items():
+                        angle = angles[joint][0]
+                        if angle < down:
+                            is_down[exercise] = True
+                        elif angle > up and is_down[exercise]:
+                            is_down[exercise] = False
+                            overlay[exercise] += int(frames[n] >= start_frame)
+                    mp_drawing.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+                    cv2.putText(frame, f"Push-ups: {overlay['pushups']}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                    cv2.putText(frame, f"Squats: {overlay['squats']}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            n += 1
+
+            # Display frame
+            if display:
+                cv2.imshow("Exercise Counter", frame)
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    break
+    finally:
+        cap.release()
+        if display:
+            cv2.destroyAllWindows()
+        if own_pose:
+            pose.close()
+
+    return LandmarkSeries(landmarks[:n], frames[:n], times[:n], start_frame)
+
+# --- Cache des landmarks ---
+
+# Une ligne par image analysée : 4 + 4 + 33 * 3 * 2 = 206 octets
+LANDMARK_DTYPE = np.dtype([("frame", "<i4"), ("time", "<f4"), ("landmarks", "<f2", (N_LANDMARKS, 3))])
+
+@functools.lru_cache(maxsize=4096)
+def _file_hash(path, mtime_ns, size):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def video_hash(video_path):
+    """SHA-256 of the video's content (memoized while the file is unchanged)."""
+    st = os.stat(video_path)
+    return _file_hash(os.path.realpath(video_path), st.st_mtime_ns, st.st_size)
+
+def landmark_cache_path(video_path, stride=SPORT_STRIDE, adaptive=SPORT_ADAPTIVE, max_width=SPORT_MAX_WIDTH):
+    """
+    `<video>.<key>.landmarks.npy`, next to the video (or in SPORT_LANDMARK_CACHE_DIR).
+    The key covers the content hash and the sampling options: a re-encoded or
+    replaced video, or another sampling, gets a new file.
+    """
+    key = hashlib.sha256(f"{video_hash(video_path)}:{stride}:{int(adaptive)}:{max_width}".encode()).hexdigest()[:16]
+    directory = SPORT_LANDMARK_CACHE_DIR or os.path.dirname(os.path.abspath(video_path))
+    return os.path.join(directory, f"{os.path.basename(video_path)}.{key}.landmarks.npy")
+
+def save_landmarks(series, path):
+    rows = np.empty(len(series), dtype=LANDMARK_DTYPE)
+    rows["frame"] = series.frames
+    rows["time"] = series.times
+    rows["landmarks"] = series.landmarks
+    # Écriture atomique : un autre processus ne lit jamais un fichier à moitié écrit
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, rows)
+    os.replace(tmp, path)
+
+def load_landmarks(path):
+    """The cached `LandmarkSeries`, memory-mapped (nothing is read before the angles are computed)."""
+    rows = np.load(path, mmap_mode="r")
+    return LandmarkSeries(rows["landmarks"], rows["frame"], rows["time"])
+
+def cached_landmarks(video_path, pose=None, refresh=False, stride=SPORT_STRIDE, adaptive=SPORT_ADAPTIVE,
+                     max_width=SPORT_MAX_WIDTH):
+    """
+    The `LandmarkSeries` of a whole video: from the cache, or by running the
+    pose model (headless) and caching the result. None if the video cannot be opened.
+    """
+    if not os.path.isfile(video_path):
+        print(f"Error: Could not open video {video_path}.")
         return None
+    path = landmark_cache_path(video_path, stride, adaptive, max_width)
+    if not refresh and os.path.exists(path):
+        return load_landmarks(path)
+    series = extract_landmarks(video_path, pose=pose, stride=stride, adaptive=adaptive, max_width=max_width)
+    if series is not None:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            save_landmarks(series, path)
+        except OSError:
+            # Dossier des vidéos en lecture seule : le comptage reste valable sans cache
+            pass
+    return series
+
+def recount_cached(video_paths, thresholds=None, timestamps=False, stride=SPORT_STRIDE, adaptive=SPORT_ADAPTIVE,
+                   max_width=SPORT_MAX_WIDTH):
+    """
+    Re-score videos from their cached landmarks only (no decoding, no pose
+    model), e.g. with new `thresholds`; None for the videos without a cache.
+    """
+    results = {}
+    for video_path in dict.fromkeys(video_paths):
+        path = landmark_cache_path(video_path, stride, adaptive, max_width) if os.path.isfile(video_path) else None
+        if path is None or not os.path.exists(path):
+            results[video_path] = None
+            continue
+        results[video_path] = count_series(load_landmarks(path), timestamps=timestamps, thresholds=thresholds)
+    return results
+
+# Function to process video and count exercises
+def count_exercises(video_path, headless=False, display=True, timestamps=False, pose=None,
+                    start_frame=0, end_frame=None, warmup_frames=0,
+                    stride=SPORT_STRIDE, adaptive=SPORT_ADAPTIVE, max_width=SPORT_MAX_WIDTH,
+                    cache=SPORT_LANDMARK_CACHE, thresholds=None):
+    """
+    Count push-ups and squats in a video.
+
+    headless: skip drawing and display entirely (servers without a screen, batch checks)
+    display: show the annotated frames in a window (ignored when headless; "q" stops)
+    timestamps: also return the time (seconds into the video) each rep was completed
+    pose: a Pose to reuse (reset first, left open); by default one is created for the video
+    start_frame, end_frame: only count the reps completed in this range of frames
+    warmup_frames: frames read before start_frame to settle the tracking and the
+        up/down state, so a rep that started just before the segment is not lost
+    stride: run the pose model on one frame out of `stride` (the others are only decoded)
+    adaptive: with a stride, analyse every frame while the elbow or knee angle is
+        within ADAPTIVE_MARGIN degrees of its "down" threshold (the short part of a rep)
+    max_width: downscale frames wider than this before the pose model (0 = full size)
+    cache: headless counts of a whole video reuse (or write) its landmark cache
+    thresholds: `{"pushups": (down, up), ...}` instead of the default thresholds
+
+    The landmarks of the analysed frames go into a `(frames, 33, 3)` buffer and
+    the reps are counted on the joint angles of the whole series at once; use
+    `extract_landmarks` + `count_series` to re-count with other thresholds.
+    """
+    if cache and headless and not start_frame and end_frame is None:
+        series = cached_landmarks(video_path, pose=pose, stride=stride, adaptive=adaptive, max_width=max_width)
+    else:
+        series = extract_landmarks(video_path, headless=headless, display=display, pose=pose,
+                                   start_frame=start_frame, end_frame=end_frame, warmup_frames=warmup_frames,
+                                   stride=stride, adaptive=adaptive, max_width=max_width)
+    if series is None:
+        return None
+    return count_series(series, timestamps=timestamps, thresholds=thresholds)
+
+def video_info(video_path):
+    """`(frame count, fps)` of a video."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS) or 30.0
+    finally:
+        cap.release()
+
+def split_segments(frame_count, n_segments, warmup_frames):
+    """
+    `n_segments` contiguous `(start_frame, end_frame, warmup_frames)` ranges
+    covering the video; the last one reads to the end (the frame count of a
+    container is not always exact).
+    """
+    bounds = sorted(set(frame_count * i // n_segments for i in range(n_segments))) + [None]
+    return [(start, end, warmup_frames if start else 0) for start, end in zip(bounds, bounds[1:])]
 
-    pushup_count = 0
-    squat_count = 0
-    pushup_state = "up"
-    squat_state = "standing"
-    pushup_threshold_down = 90  # Elbow angle for push-up down state
-    pushup_threshold_up = 160   # Elbow angle for push-up up state
-    squat_threshold_down = 100  # Knee angle for squat down state
-    squat_threshold_up = 160    # Knee angle for squat up state
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        # Convert frame to RGB for MediaPipe
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = pose.process(frame_rgb)
-
-        if results.pose_landmarks:
-            landmarks = results.pose_landmarks.landmark
-
-            # Extract coordinates for push-up (elbow, shoulder, wrist)
-            left_shoulder = [landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                             landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-            left_elbow = [landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].x,
-                          landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].y]
-            left_wrist = [landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].x,
-                          landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].y]
-
-            # Extract coordinates for squat (hip, knee, ankle)
-            left_hip = [landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].x,
-                        landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].y]
-            left_knee = [landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value].x,
-                         landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value].y]
-            left_ankle = [landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value].x,
-                          landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value].y]
-
-            # Calculate angles
-            elbow_angle = calculate_angle(left_shoulder, left_elbow, left_wrist)
-            knee_angle = calculate_angle(left_hip, left_knee, left_ankle)
-
-            # Push-up detection
-            if elbow_angle < pushup_threshold_down and pushup_state == "up":
-                pushup_state = "down"
-            elif elbow_angle > pushup_threshold_up and pushup_state == "down":
-                pushup_state = "up"
-                pushup_count += 1
-
-            # Squat detection
-            if knee_angle < squat_threshold_down and squat_state == "standing":
-                squat_state = "down"
-            elif knee_angle > squat_threshold_up and squat_state == "down":
-                squat_state = "standing"
-                squat_count += 1
-
-            # Draw landmarks and counts on frame
-            mp_drawing.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-            cv2.putText(frame, f"Push-ups: {pushup_count}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.putText(frame, f"Squats: {squat_count}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-
-        # Display frame
-        cv2.imshow("Exercise Counter", frame)
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
-
-    cap.release()
-    cv2.destroyAllWindows()
-    pose.close()
-
-    return {"pushups": pushup_count, "squats": squat_count}
+def merge_counts(results):
+    """Counts of consecutive segments: each rep is counted in the segment where it is completed."""
+    merged = {"pushups": 0, "squats": 0}
+    for result in results:
+        for key, value in result.items():
+            merged[key] = merged.get(key, [] if isinstance(value, list) else 0) + value
+    return merged
+
+# --- Pool de processus : un Pose par processus ---
+
+_worker_pose = None
+
+def _init_worker():
+    global _worker_pose
+    _worker_pose = new_pose()
+
+def _count_in_worker(video_path, kwargs):
+    return count_exercises(video_path, headless=True, pose=_worker_pose, **kwargs)
+
+class VerificationPool:
+    """
+    Headless counting spread over worker processes, each with its own Pose
+    (a Pose is not safe to share between threads or processes).
+
+        with VerificationPool() as pool:
+            results = pool.count_videos(paths)
+    """
+
+    def __init__(self, workers=SPORT_WORKERS):
+        self.workers = workers
+        # spawn : pas de fork d'un processus qui a déjà des threads (Flask, MediaPipe)
+        self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                             mp_context=multiprocessing.get_context("spawn"))
+
+    def count_videos(self, video_paths, timestamps=False, **options):
+        """
+        Counts by path, one video per task, the longest videos first.
+        `options` go to `count_exercises` (stride, adaptive, max_width, cache, thresholds).
+        """
+        video_paths = list(dict.fromkeys(video_paths))
+        order = sorted(video_paths, key=lambda path: -video_info(path)[0])
+        futures = {path: self._executor.submit(_count_in_worker, path, {"timestamps": timestamps, **options})
+                   for path in order}
+        return {path: futures[path].result() for path in video_paths}
+
+    def count_long_video(self, video_path, segments=None, overlap_seconds=SEGMENT_OVERLAP_SECONDS,
+                         timestamps=False, **options):
+        """
+        Counts for one video split in `segments` time ranges (one per worker by
+        default), counted in parallel and merged. Each segment first reads
+        `overlap_seconds` of the previous one, so reps crossing a boundary are
+        counted once.
+        """
+        sampling = {key: options[key] for key in ("stride", "adaptive", "max_width") if key in options}
+        if (options.get("cache", SPORT_LANDMARK_CACHE) and os.path.isfile(video_path)
+                and os.path.exists(landmark_cache_path(video_path, **sampling))):
+            # Landmarks déjà en cache : compter est immédiat, sans découper ni passer par un worker
+            return count_exercises(video_path, headless=True, timestamps=timestamps, **options)
+        frame_count, fps = video_info(video_path)
+        if frame_count <= 0:
+            return self._executor.submit(_count_in_worker, video_path, {"timestamps": timestamps, **options}).result()
+        ranges = split_segments(frame_count, segments or self.workers, int(overlap_seconds * fps))
+        futures = [
+            self._executor.submit(_count_in_worker, video_path, {
+                "timestamps": timestamps, "start_frame": start, "end_frame": end, "warmup_frames": warmup,
+                **options
+            })
+            for start, end, warmup in ranges
+        ]
+        results = [future.result() for future in futures]
+        if any(result is None for result in results):
+            return None
+        return merge_counts(results)
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def count_exercises_batch(video_paths, timestamps=False, workers=1, **options):
+    """
+    Headless counts for several videos (e.g. the submissions of a fitness challenge), by path.
+    `options` go to `count_exercises` (stride, adaptive, max_width, cache, thresholds).
+    """
+    if workers > 1:
+        with VerificationPool(workers) as pool:
+            return pool.count_videos(video_paths, timestamps=timestamps, **options)
+    pose = new_pose()
+    try:
+        return {video_path: count_exercises(video_path, headless=True, timestamps=timestamps, pose=pose, **options)
+                for video_path in dict.fromkeys(video_paths)}
+    finally:
+        pose.close()
 
 # Example usage
 if __name__ == "__main__":
-    video_path = "pushup.mp4"  # Replace with your video path
-    result = count_exercises(video_path)
-    if result:
-        print(f"Exercise Counts: {result}")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Count push-ups and squats in videos.")
+    parser.add_argument("videos", nargs="*", default=["pushup.mp4"])
+    parser.add_argument("--headless", action="store_true", help="no drawing, no window")
+    parser.add_argument("--timestamps", action="store_true", help="also print when each rep was completed")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (headless)")
+    parser.add_argument("--segments", type=int, default=0,
+                        help="split each video in this many overlapping segments counted in parallel")
+    parser.add_argument("--stride", type=int, default=SPORT_STRIDE, help="analyse one frame out of N")
+    parser.add_argument("--adaptive", action=argparse.BooleanOptionalAction, default=SPORT_ADAPTIVE,
+                        help="analyse every frame near the down thresholds")
+    parser.add_argument("--max-width", type=int, default=SPORT_MAX_WIDTH, help="downscale frames to this width")
+    parser.add_argument("--pushups", type=float, nargs=2, metavar=("DOWN", "UP"), help="push-up elbow thresholds")
+    parser.add_argument("--squats", type=float, nargs=2, metavar=("DOWN", "UP"), help="squat knee thresholds")
+    parser.add_argument("--recount", action="store_true",
+                        help="count from the landmark caches only (no pose model; no cache -> no result)")
+    args = parser.parse_args()
+    options = {"stride": args.stride, "adaptive": args.adaptive, "max_width": args.max_width}
+    thresholds = {name: tuple(value) for name, value in (("pushups", args.pushups), ("squats", args.squats)) if value}
+
+    if args.recount:
+        results = recount_cached(args.videos, thresholds=thresholds, timestamps=args.timestamps, **options)
+    elif args.segments:
+        with VerificationPool(args.workers) as pool:
+            results = {path: pool.count_long_video(path, segments=args.segments, timestamps=args.timestamps,
+                                                   thresholds=thresholds, **options)
+                       for path in args.videos}
+    elif args.headless or len(args.videos) > 1:
+        results = count_exercises_batch(args.videos, timestamps=args.timestamps, workers=args.workers,
+                                        thresholds=thresholds, **options)
+    else:
+        results = {args.videos[0]: count_exercises(args.videos[0], timestamps=args.timestamps,
+                                                   thresholds=thresholds, **options)}
+    for video_path, result in results.items():
+        if result:
+            print(f"{video_path}: Exercise Counts: {result}")
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from commit_cache import CACHE_DIR
+
+# Durée de validité d'un verdict en cache (secondes, 7 jours par défaut)
+VERDICT_CACHE_TTL = float(os.getenv("VERDICT_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+def llm_identity(llm_function) -> str:
+    """Identify the model behind an LLM callable (its `model_id`, or its qualified name)."""
+    model_id = getattr(llm_function, "model_id", None)
+    if model_id:
+        return model_id
+    return f"{getattr(llm_function, '__module__', '')}.{getattr(llm_function, '__qualname__', repr(llm_function))}"
+
+
+def prompt_fingerprint(prompt: str, model: str) -> str:
+    h = hashlib.sha256()
+    h.update(model.encode())
+    h.update(b"\0")
+    h.update(prompt.encode())
+    return h.hexdigest()
+
+
+class VerdictCache:
+    """
+    LLM verdicts (parsed `extract_summary` result plus stats) keyed by the
+    fingerprint of the prompt and the model that answered it.
+    """
+
+    def __init__(self, path: str = None, ttl: float = VERDICT_CACHE_TTL):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "verdicts.sqlite")
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS verdicts (
+                fingerprint TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, fingerprint: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM verdicts WHERE fingerprint = ? AND expires_at > ?",
+                (fingerprint, time.time()),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        result = json.loads(row[0])
+        result["cached_at"] = row[1]
+        return result
+
+    def put(self, fingerprint: str, model: str, result: dict, ttl: float = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO verdicts (fingerprint, model, result, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (fingerprint, model, json.dumps(result), now, now + (self.ttl if ttl is None else ttl)),
+            )
+            # On en profite pour purger les entrées expirées
+            self._conn.execute("DELETE FROM verdicts WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+
+    def invalidate(self, fingerprint: str = None, model: str = None) -> int:
+        """Drop one verdict, every verdict of a model, or everything. Returns the number removed."""
+        query, params = "DELETE FROM verdicts", []
+        if fingerprint is not None:
+            query, params = query + " WHERE fingerprint = ?", [fingerprint]
+        elif model is not None:
+            query, params = query + " WHERE model = ?", [model]
+        with self._lock:
+            removed = self._conn.execute(query, params).rowcount
+            self._conn.commit()
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_verdict_cache() -> VerdictCache:
+    """Process-wide cache, opened on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = VerdictCache()
+        return _cache